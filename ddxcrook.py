@@ -1,6 +1,19 @@
 import time
 import os
+import re
+import sys
+import json
 import random
+import select
+import shutil
+import codecs
+import inspect
+import functools
+import unicodedata
+import marshal
+import hashlib
+import argparse
+from collections import Counter, deque, namedtuple
 
 # Simple color class that works on most terminals
 class Color:
@@ -14,632 +27,1545 @@ class Color:
     RESET = '\033[0m'     # Reset color
     BOLD = '\033[1m'      # Bold text for emphasis
 
-# ======= HINT SYSTEM =======
-# Clinical pearls hints dictionary - organized by diagnosis
-hints_dict = {
-    "kawasaki": [
-        "Does... 'CRASH & BURN' ring a bell?! 👀",
-        "This disease typically affects wee lads under 5 years old.",
-        "The strawberry tongue is a distinctive finding... 🍓",
-        "Coronary artery aneurysms are the most serious complication.",
-        "Fever lasting more than 5 days is a key diagnostic criterion."
-    ]
+class Cursor:
+    """ANSI cursor/screen codes (the Color codes' less glamorous cousins)"""
+    HOME = '\033[H'            # Top-left corner
+    CLEAR_SCREEN = '\033[2J'   # Wipe everything
+    CLEAR_BELOW = '\033[J'     # Wipe from the cursor to the bottom
+    CLEAR_LINE = '\033[2K'     # Wipe the current line
+    FULL_REGION = '\033[r'     # Let the whole screen scroll again
+
+    @staticmethod
+    def move(row, col=1):
+        """Jump to a row/column (1-based, like the terminal counts)"""
+        return f'\033[{row};{col}H'
+
+    @staticmethod
+    def scroll_region(top, bottom):
+        """Only rows top..bottom scroll; everything above stays put"""
+        return f'\033[{top};{bottom}r'
+
+# ======= RENDER MODE =======
+# "typewriter" is the normal dramatic pacing. "instant" is for automated
+# regression/grading runs: no sleeps, no screen clearing, and scene transitions
+# advance on their own. Turn it on with DDXCROOK_INSTANT=1 or --instant.
+RENDER_MODES = ("typewriter", "instant")
+render_mode = "instant" if os.environ.get("DDXCROOK_INSTANT") else "typewriter"
+
+def set_render_mode(mode):
+    """Switches the render mode for the whole process"""
+    global render_mode
+    if mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode {mode!r} (pick one of {', '.join(RENDER_MODES)})")
+    render_mode = mode
+
+def is_instant():
+    """True when we're running headless and shouldn't wait for anything"""
+    return render_mode == "instant"
+
+# ======= END RENDER MODE =======
+
+# ======= INSTRUMENTATION =======
+# Where does a session's time go: typing, waiting for the student, or actual
+# game logic? Attach a probe (see ddxcrook_timing.py) to a GameState and every
+# decision function and render call below tells it when it starts and ends.
+# A probe is anything with enter(kind, name), exit(kind, name) and scene(name),
+# where kind is "decision", "render", "input" or "sleep".
+# Until the first probe gets attached the hooks aren't even installed, so
+# games nobody is timing run the plain functions and pay nothing at all.
+
+_hooked = {}  # Function name -> the version that reports to the game's probe
+
+def hooked(kind):
+    """Makes a reporting version of a game(...) function for install_hooks() to swap in"""
+    def decorate(function):
+        name = function.__name__
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def wrapper(game, *args, **kwargs):
+                probe = game.probe
+                if probe is None:
+                    return await function(game, *args, **kwargs)
+                probe.enter(kind, name)
+                try:
+                    return await function(game, *args, **kwargs)
+                finally:
+                    probe.exit(kind, name)
+        else:
+            @functools.wraps(function)
+            def wrapper(game, *args, **kwargs):
+                probe = game.probe
+                if probe is None:
+                    return function(game, *args, **kwargs)
+                probe.enter(kind, name)
+                try:
+                    return function(game, *args, **kwargs)
+                finally:
+                    probe.exit(kind, name)
+        _hooked[name] = wrapper
+        return function
+    return decorate
+
+def install_hooks():
+    """Swaps in the reporting versions (once a probe shows up; they stay after that)"""
+    globals().update(_hooked)
+# ======= END INSTRUMENTATION =======
+
+# ======= RENDERER =======
+# Every character used to get its own print(flush=True) + sleep, which means one
+# write syscall and one timer wakeup per glyph. Over SSH with a whole cohort
+# logged in that's a LOT of tiny writes, so all output now goes through this
+# buffer and hits the terminal in frame-sized chunks instead.
+FRAME_TIME = 0.05  # seconds per typewriter frame (~20 frames a second)
+
+# Every pause in the game (typewriter frames, dramatic beats) goes through the
+# Renderer's `sleep`, so the clock is pluggable: blocking_sleep at the terminal,
+# asyncio on the ward server, or a VirtualClock when nobody should have to wait.
+# Whatever the clock, the Renderer adds up how long the pacing *would* take per
+# scene (even in instant mode), which is how long a student has to sit and read.
+async def blocking_sleep(seconds):
+    """time.sleep() dressed up as a coroutine, for the plain terminal game"""
+    time.sleep(seconds)
+
+class VirtualClock:
+    """A clock that never actually waits: every sleep returns at once and just
+    moves `now` forward (tests, benchmarks, "how long is this case?" runs)"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+def duration(seconds):
+    """Reading time the way people say it: 45s, 6m40s"""
+    minutes, seconds = divmod(round(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+async def read_stdin():
+    """input() dressed up as a coroutine, for the plain terminal game"""
+    return input()
+
+class Renderer:
+    """Buffers game text and writes it to the terminal a frame at a time"""
+
+    def __init__(self, stream=None, sleep=blocking_sleep, frame_time=FRAME_TIME, muted=False, profile=None):
+        self.stream = stream or sys.stdout
+        self.sleep = sleep  # An async sleep: asyncio.sleep on the server, blocking at the terminal
+        self.frame_time = frame_time
+        self.muted = muted  # Nobody's watching (simulations): drop text before we even format it
+        self.probe = None   # Gets told about every pause (see INSTRUMENTATION)
+        self.keys = None    # A Keyboard, when a keypress can skip ahead (terminal game only)
+        self.skipping = False  # A key was pressed: finish this line at once, no more pauses
+        self.profile = profile or PROFILES["full"]  # What the terminal can show (see detect_profile)
+        self.downgrade = downgrader(self.profile)     # None when the text can go out as-is
+        self.pending = []
+        # Running totals for the scene currently on screen
+        self.scene = "intro"
+        self.writes = 0
+        self.bytes = 0
+        self.reading = 0.0  # Seconds of pacing (slept, or skipped in instant mode)
+        # (scene, writes, bytes, reading) for every finished scene
+        self.history = []
+
+    def write(self, text):
+        """Queues text for the next frame (nothing reaches the terminal yet)"""
+        if not self.muted:
+            self.pending.append(self.downgrade(text) if self.downgrade else text)
+
+    def write_frame(self, block):
+        """Queues a pre-rendered block from frame(), which is already trimmed to our profile"""
+        if not self.muted:
+            self.pending.append(block)
+
+    def print(self, *parts, sep=" ", end="\n"):
+        """Same as the built-in print(), but buffered"""
+        if not self.muted:
+            self.write(sep.join(str(part) for part in parts) + end)
+
+    def flush(self):
+        """Sends everything queued so far to the terminal in ONE write"""
+        if not self.pending:
+            return
+        frame = "".join(self.pending)
+        self.pending = []
+        self.stream.write(frame)
+        self.stream.flush()
+        self.writes += 1
+        self.bytes += len(frame.encode("utf-8"))
+
+    async def pause(self, seconds):
+        """Every dramatic pause in the game goes through here (free in instant mode)"""
+        if seconds <= 0:
+            return
+        self.reading += seconds
+        if is_instant() or self.skipping:
+            return
+        if self.probe is None:
+            await self.wait(seconds)
+            return
+        self.probe.enter("sleep", "pause")
+        try:
+            await self.wait(seconds)
+        finally:
+            self.probe.exit("sleep", "pause")
+
+    async def wait(self, seconds):
+        """Sleeps, unless a keypress cuts it short (then the rest of the line skips too)"""
+        if self.keys is None:
+            await self.sleep(seconds)
+        elif self.keys.poll(seconds):
+            self.skipping = True
+
+    async def typewrite(self, text, delay):
+        """Types text out at `delay` seconds per character, one frame per write"""
+        if delay <= 0 or is_instant():
+            self.write(text)
+            self.flush()
+            self.reading += max(delay, 0) * len(text)  # What the typing would have taken
+            return
+
+        # Same reading speed as before, just a few characters per write
+        chars_per_frame = max(1, int(self.frame_time / delay + 0.5))
+        # Answers already typed ahead? Then there's no point animating anything
+        self.skipping = self.keys is not None and bool(self.keys.lines)
+        for start in range(0, len(text), chars_per_frame):
+            if self.skipping:
+                # Fast reader! The rest of the line goes out in one write
+                self.write(text[start:])
+                self.flush()
+                self.reading += delay * (len(text) - start)
+                return
+            chunk = text[start:start + chars_per_frame]
+            self.write(chunk)
+            self.flush()
+            await self.pause(delay * len(chunk))
+
+    def begin_scene(self, scene):
+        """Closes the books on the current scene and starts counting a new one"""
+        self.flush()
+        if self.writes or self.reading:
+            self.history.append((self.scene, self.writes, self.bytes, self.reading))
+        self.scene = scene
+        self.writes = 0
+        self.bytes = 0
+        self.reading = 0.0
+
+    def reading_time(self):
+        """{scene: seconds of forced reading}, for every scene so far"""
+        times = {}
+        for scene, _, _, reading in self.history + [(self.scene, self.writes, self.bytes, self.reading)]:
+            times[scene] = times.get(scene, 0.0) + reading
+        return times
+
+    def report(self):
+        """Returns a little table of syscalls, bytes and reading time per scene"""
+        rows = self.history + [(self.scene, self.writes, self.bytes, self.reading)]
+        lines = [f"{'scene':<20}{'writes':>8}{'bytes':>10}{'reading':>10}"]
+        for scene, writes, size, reading in rows:
+            lines.append(f"{scene:<20}{writes:>8}{size:>10}{duration(reading):>10}")
+        lines.append(f"{'TOTAL':<20}{sum(r[1] for r in rows):>8}{sum(r[2] for r in rows):>10}"
+                     f"{duration(sum(r[3] for r in rows)):>10}")
+        return "\n".join(lines)
+
+@hooked("input")
+async def ask(game, prompt=""):
+    """input(), but makes sure everything buffered is on screen first"""
+    keys = game.screen.keys
+    if keys:
+        # Normal typing again *before* the prompt shows, so no answer gets swallowed
+        keys.stop()
+        keys.drain()  # Keys pressed to skip text aren't part of the answer
+        if keys.lines:
+            # Typed ahead while the text was still going: answer right away
+            answer = keys.lines.popleft()
+            game.screen.write(prompt + answer + "\n")
+            game.screen.flush()
+            return answer
+    game.screen.write(prompt)
+    game.screen.flush()
+    return await game.readline()
+# ======= END RENDERER =======
+
+# ======= TERMINAL =======
+# Clearing used to fork a shell to run `clear` on every scene transition. Now
+# it's just a couple of escape sequences. The stats block also gets pinned to
+# the top of the screen (the text below scrolls underneath it), so each scene
+# only repaints the stats lines that actually changed. Where the cursor can't
+# move (pipes, dumb terminals, instant mode) the block is printed once and
+# after that each scene just gets a one-line "what changed" update.
+def enable_ansi():
+    """Windows consoles need to be asked nicely before they understand ANSI codes"""
+    if os.name != 'nt':
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004)  # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (AttributeError, OSError):
+        pass  # Old console: colors will just look a bit funny
+
+def can_move_cursor(stream):
+    """Cursor tricks only make sense on a real terminal that isn't 'dumb'"""
+    isatty = getattr(stream, "isatty", None)
+    return (not is_instant() and isatty is not None and isatty()
+            and os.environ.get("TERM") != "dumb")
+
+class Keyboard:
+    """Notices keypresses while text is typing out, so fast readers can skip ahead
+
+    While the game is talking, the terminal is switched to cbreak mode (keys
+    arrive one at a time, without Enter, and aren't echoed over the dialogue).
+    Whatever gets typed is kept in `typed` instead of landing in the next
+    input() as garbage, and every finished line (typed ahead and ended with
+    Enter) goes into the `lines` queue, where the next prompts pick it up.
+    Returning students can type "1 1 1 1 1" straight through the case.
+    stop() puts the terminal back to normal for prompts.
+    POSIX terminals only: open() gives None anywhere else.
+    """
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.saved = None        # The normal terminal settings, while we're in cbreak mode
+        self.typed = bytearray()
+        self.lines = deque()     # Answers typed ahead, oldest first
+
+    @classmethod
+    def open(cls, stream=None):
+        stream = stream or sys.stdin
+        if os.name != "posix" or is_instant() or not stream.isatty():
+            return None
+        try:
+            import termios  # noqa: F401 (not there on every platform)
+        except ImportError:
+            return None
+        return cls(stream.fileno())
+
+    def start(self):
+        """cbreak mode on (done on the first poll of each stretch of dialogue)"""
+        if self.saved is None:
+            import termios
+            import tty
+            self.saved = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd, termios.TCSANOW)
+
+    def stop(self):
+        """Back to normal line-by-line input, keeping anything typed in the meantime"""
+        if self.saved is not None:
+            import termios
+            self.poll(0)
+            termios.tcsetattr(self.fd, termios.TCSANOW, self.saved)
+            self.saved = None
+
+    def poll(self, timeout=0):
+        """True if a key got pressed, waiting up to `timeout` seconds for one"""
+        self.start()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        self.typed += os.read(self.fd, 1024)
+        *finished, rest = self.typed.replace(b"\r", b"\n").split(b"\n")
+        for line in finished:
+            line = line.decode("utf-8", errors="ignore").strip()
+            if line:
+                self.lines.append(line)  # A bare Enter is just another "skip!"
+        self.typed = bytearray(rest)
+        return True
+
+    def drain(self):
+        """Everything typed since the last drain()"""
+        typed = self.typed.decode("utf-8", errors="ignore")
+        self.typed.clear()
+        return typed
+
+class StatusPanel:
+    """Keeps the stats block pinned at the top and repaints only the lines that changed"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.lines = []     # What's painted on rows 1..len(lines) right now
+        self.rows = 0       # Terminal height when we last painted
+        self.fields = None  # The stats as of the last time we showed them (see stats_fields)
+
+    @property
+    def pinned(self):
+        return bool(self.lines)
+
+    def can_pin(self, lines):
+        """Whether this many lines can sit pinned at the top of the screen"""
+        return can_move_cursor(self.screen.stream) and len(lines) <= shutil.get_terminal_size().lines // 2
+
+    def draw(self, lines):
+        """Shows a new snapshot of the panel"""
+        rows = shutil.get_terminal_size().lines
+        # Tiny terminal (or no terminal at all)? Just print it like always.
+        if not self.can_pin(lines):
+            self.release()
+            for line in lines:
+                self.screen.print(line)
+            return
+
+        # Window resized? Then we can't trust anything that's on screen.
+        old_lines = self.lines if rows == self.rows else []
+        resized = len(lines) != len(old_lines)
+
+        out = []
+        if resized:
+            out.append(Cursor.FULL_REGION)  # Let us paint below the old panel
+        for row, line in enumerate(lines):
+            if row >= len(old_lines) or old_lines[row] != line:
+                out.append(Cursor.move(row + 1) + Cursor.CLEAR_LINE + line)
+        if resized:
+            # Panel changed height (new clue!), so move the scrolling area too
+            out.append(Cursor.scroll_region(len(lines) + 1, rows))
+        out.append(Cursor.move(len(lines) + 1))
+        if resized:
+            out.append(Cursor.CLEAR_BELOW)
+
+        self.screen.write("".join(out))
+        self.lines = list(lines)
+        self.rows = rows
+
+    def clear_below(self):
+        """Wipes the scene text but leaves the pinned panel alone"""
+        self.screen.write(Cursor.move(len(self.lines) + 1) + Cursor.CLEAR_BELOW)
+
+    def release(self):
+        """Unpins the panel and gives the terminal its normal scrolling back"""
+        if self.pinned:
+            self.screen.write(Cursor.FULL_REGION + Cursor.move(self.rows))
+            self.lines = []
+
+# ======= END TERMINAL =======
+
+# ======= OUTPUT PROFILES =======
+# Not every terminal wants colors and emoji: NO_COLOR users, TERM=dumb, output
+# piped into a file, an ASCII-only console, or a student on hospital Wi-Fi where
+# every byte counts (a 😰 is 4 bytes plus its color codes, every stats repaint).
+# A profile says what the terminal can take, and the Renderer's write() trims
+# everything down to it, so no drawing code has to worry about it.
+Profile = namedtuple("Profile", "color charset width")
+DEFAULT_WIDTH = 80   # When we can't ask the terminal (telnet clients, pipes)
+
+PROFILES = {
+    "full": Profile(color=True, charset="utf-8", width=DEFAULT_WIDTH),    # Colors and emoji
+    "mono": Profile(color=False, charset="utf-8", width=DEFAULT_WIDTH),   # Emoji, no colors
+    "plain": Profile(color=False, charset="ascii", width=DEFAULT_WIDTH),  # 7-bit text, nothing else
 }
 
-# Track hint usage
-hints_used = 0
-max_hints = 3
+# Stand-ins for the fancy characters the game and the cases use (anything
+# else non-ASCII loses its accents, or gets dropped if it has none)
+ASCII_GLYPHS = str.maketrans({
+    "█": "#", "░": ".", "═": "=", "║": "|", "╔": "+", "╗": "+", "╚": "+", "╝": "+",
+    "•": "-", "°": "", "✨": "*", "⭐": "*", "😰": "!", "🏆": "*", "💡": "*",
+    "⚠": "!", "🔍": ">", "📋": "#", "📚": "#", "💾": "#", "🏥": "+", "📊": "#", "\ufe0f": None,
+})
+
+COLOR_CODES = re.compile("\033\\[[0-9;]*m")  # Just the colors: cursor moves are left alone
+
+def to_ascii(text):
+    """Boils text down to plain 7-bit ASCII"""
+    text = unicodedata.normalize("NFKD", text.translate(ASCII_GLYPHS))
+    return text.encode("ascii", "ignore").decode("ascii")
+
+def strip_colors(text):
+    return COLOR_CODES.sub("", text)
+
+def downgrader(profile):
+    """The function that trims text down to a profile (None for 'send it all')"""
+    if profile.charset == "ascii":
+        return to_ascii if profile.color else lambda text: to_ascii(strip_colors(text))
+    return None if profile.color else strip_colors
+
+def detect_profile(stream=None, environ=None):
+    """Works out what the terminal on `stream` can show (the 'auto' profile)
+
+    Colors need a real terminal that isn't TERM=dumb and a user who didn't set
+    NO_COLOR. Emoji need a UTF-8 stream. Width comes from the terminal itself.
+    """
+    stream = stream or sys.stdout
+    environ = os.environ if environ is None else environ
+    isatty = getattr(stream, "isatty", None)
+    tty = isatty is not None and isatty()
+    color = tty and environ.get("TERM") != "dumb" and not environ.get("NO_COLOR")
+    try:
+        utf8 = codecs.lookup(getattr(stream, "encoding", None) or "ascii").name == "utf-8"
+    except LookupError:
+        utf8 = False
+    width = shutil.get_terminal_size((DEFAULT_WIDTH, 24)).columns if tty else DEFAULT_WIDTH
+    return Profile(color=bool(color), charset="utf-8" if utf8 else "ascii", width=width)
+
+def pick_profile(name, stream=None):
+    """A profile by name ('auto' asks the terminal for everything, the rest just for its width)"""
+    detected = detect_profile(stream)
+    if name == "auto":
+        return detected
+    if name not in PROFILES:
+        raise ValueError(f"Unknown output profile {name!r} (pick auto or one of {', '.join(PROFILES)})")
+    return PROFILES[name]._replace(width=detected.width)
+# ======= END OUTPUT PROFILES =======
+
+# ======= FRAME CACHE =======
+# Title art, dividers and exam/lab panels look the same every time they show
+# up, so each one is built once per terminal profile (colors or not, how wide)
+# and then goes out as one ready-made string instead of being glued back
+# together from color codes and "="*48 on every scene.
+DIVIDER_WIDTH = 48   # The ='s between the sparkles, on a wide enough screen
+
+_frames = {}
+
+def paint(profile, color, text):
+    """Wraps text in a color code (unless the profile says no colors)"""
+    if not color or not profile.color:
+        return text
+    return color + text + Color.RESET
+
+def frame(profile, key, render):
+    """The pre-rendered block for `key`: render(profile) the first time, cached after that"""
+    try:
+        return _frames[profile, key]
+    except KeyError:
+        block = render(profile)
+        downgrade = downgrader(profile)
+        if downgrade:
+            # Trimmed to the profile once, here, so Renderer.write_frame() can skip it
+            block = tuple(map(downgrade, block)) if isinstance(block, tuple) else downgrade(block)
+        _frames[profile, key] = block
+        return block
+
+def _divider(profile):
+    width = max(8, min(DIVIDER_WIDTH, profile.width - 4))
+    return ("", paint(profile, Color.CYAN, "✨" + "=" * width + "✨"), "")
+
+def _divider_text(profile):
+    return "".join(line + "\n" for line in frame(profile, "divider", _divider))
+
+def _panel(text):
+    def render(profile):
+        return "".join(paint(profile, Color.BOLD, line) + "\n" for line in text) + "\n"
+    return render
+
+def _art(case):
+    def render(profile):
+        style, art = case.art
+        return paint(profile, getattr(Color, style.upper(), ""), "\n" + art + "\n") + "\n"
+    return render
+# ======= END FRAME CACHE =======
+
+# ======= CASE FILES =======
+# Each case lives in cases/<name>.json: scenes, options, stat effects, findings,
+# clues and hints. The loader checks a case once, compiles it into plain tuples
+# where scenes point at each other by index, and caches that compiled form in
+# cases/.cache (keyed by a hash of the file). New cases are just new files!
+# At startup we only know the case *names* (a directory listing); a case's
+# scenes, hints and title art are read the first time someone picks it, so a
+# library of hundreds of cases costs nothing until they're played.
+CASES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cases")
+CACHE_DIR = os.path.join(CASES_DIR, ".cache")
+CASE_FORMAT = 5  # Bump this whenever the compiled layout changes
+
+STATS = ("anxiety", "reputation", "correct_choices")  # What an option's "effects" can change
+TEXT_STYLES = ("plain", "red", "green", "yellow", "blue", "purple", "cyan")
+# Plus "panel": a block of bold lines that shows up all at once (exam findings, labs...)
+FINDING_TAGS = tuple(sys.intern(tag) for tag in ("vitals", "history", "exam", "labs", "diagnosis"))
+
+Case = namedtuple("Case", "name hash title diagnosis attending art welcome hints intro outro start nodes scenes endings")
+Scene = namedtuple("Scene", "name lines findings summary menu repeat_menu options invalid choices free_text unlisted")
+Option = namedtuple("Option", "label lines effects findings clues next")
+Ending = namedtuple("Ending", "name win lines tiers")
+Summary = namedtuple("Summary", "opening lead_tag lead rest_tags rest empty")
+
+class CaseError(Exception):
+    """Something is wrong with a case file"""
+
+class Note:
+    """One line of the chart, tagged with what kind of thing it is
+
+    Notes are built once when a case loads and every student's chart just
+    points at them, so a thousand charts don't mean a thousand copies.
+    """
+    __slots__ = ("tag", "text")
+
+    def __init__(self, tag, text):
+        self.tag = sys.intern(tag)  # Interned, so tags can be compared with `is`
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.tag!r}, {self.text!r})"
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.tag is self.tag and other.text == self.text
+
+    def __hash__(self):
+        return hash((self.tag, self.text))
+
+class Finding(Note):
+    """Something the student found out: vitals, history, exam, labs..."""
+    __slots__ = ()
+
+class Hint(Note):
+    """A "Diagnosis Clues" entry on the stats panel"""
+    __slots__ = ()
+
+def _expect(value, kind, where, what):
+    """Checks a piece of the case file has the right shape (a list of lines, an object per option...)"""
+    if not isinstance(value, kind):
+        shape = {dict: "an object", list: "a list", str: "text"}[kind]
+        raise CaseError(f"{where}: {what} should be {shape}, got {value!r}")
+    return value
+
+def _compile_line(line, where):
+    """Checks one [style, text] line"""
+    if not isinstance(line, list) or len(line) != 2:
+        raise CaseError(f"{where}: lines look like [style, text], got {line!r}")
+    style, text = line
+    if style == "panel":
+        rows = _expect(text, list, where, "a panel")
+        return (style, tuple(_expect(row, str, where, "panel lines") for row in rows))
+    if style not in TEXT_STYLES:
+        raise CaseError(f"{where}: unknown style {style!r}")
+    return (style, _expect(text, str, where, "line text"))
+
+def _compile_lines(lines, where):
+    return tuple(_compile_line(line, where) for line in _expect(lines, list, where, "lines"))
+
+def _compile_tag(tag, where):
+    if tag not in FINDING_TAGS:
+        raise CaseError(f"{where}: unknown tag {tag!r} (use one of {', '.join(FINDING_TAGS)})")
+    return tag
+
+def _compile_notes(notes, where, default_tag=None):
+    """Checks [tag, text] findings (or plain text, if there's a default tag)"""
+    compiled = []
+    for note in _expect(notes, list, where, "findings"):
+        if isinstance(note, str) and default_tag:
+            note = [default_tag, note]
+        if not isinstance(note, list) or len(note) != 2:
+            raise CaseError(f"{where}: findings look like [tag, text], got {note!r}")
+        compiled.append((_compile_tag(note[0], where), _expect(note[1], str, where, "finding text")))
+    return tuple(compiled)
+
+def _compile_choices(options, where):
+    """The scene's choice table: every answer that picks an option -> that option's index
+
+    Each option answers to its number, its letter (1 = a, 2 = b...) and any
+    keyword `aliases` the case gives it, so the prompt is one dict lookup.
+    """
+    choices = {}
+    for index, option in enumerate(options):
+        answers = [str(index + 1), chr(ord("a") + index)]
+        aliases = _expect(option.get("aliases", []), list, f"{where}/option {index + 1}", "aliases")
+        answers += [normalize_answer(str(alias)) for alias in aliases]
+        for answer in answers:
+            if answer == "hint" or choices.get(answer, index) != index:
+                raise CaseError(f"{where}: {answer!r} can't pick option {index + 1} (it's already taken)")
+            choices[answer] = index
+    return choices
+
+def compile_case(name, data, digest):
+    """Checks a parsed case file and turns it into the compact, indexed form"""
+    _expect(data, dict, name, "the case file")
+    scenes = _expect(data.get("scenes") or {}, dict, name, "scenes")
+    endings = _expect(data.get("endings") or {}, dict, name, "endings")
+    # Scenes come first, then endings; "next" just points at a position in here
+    nodes = list(scenes) + list(endings)
+    index = {node: i for i, node in enumerate(nodes)}
+
+    def target(node, where):
+        if node is None:
+            return -1  # Stay in the same scene
+        if node not in index:
+            raise CaseError(f"{where}: 'next' points at unknown scene {node!r}")
+        return index[node]
+
+    compiled_scenes = []
+    for scene_name, scene in scenes.items():
+        _expect(scene, dict, f"{name}/{scene_name}", "each scene")
+        options = []
+        for number, option in enumerate(_expect(scene.get("options", []), list, f"{name}/{scene_name}", "options"), 1):
+            where = f"{name}/{scene_name}/option {number}"
+            _expect(option, dict, where, "each option")
+            effects = _expect(option.get("effects", {}), dict, where, "effects")
+            unknown = set(effects) - set(STATS)
+            if unknown:
+                raise CaseError(f"{where}: unknown stats {sorted(unknown)}")
+            options.append((
+                _expect(option["label"], str, where, "label"),
+                _compile_lines(option.get("lines", []), where),
+                tuple(int(effects.get(stat, 0)) for stat in STATS),
+                _compile_notes(option.get("findings", []), where),
+                _compile_notes(option.get("clues", []), where, default_tag="diagnosis"),
+                target(option.get("next"), where),
+            ))
+        where = f"{name}/{scene_name}"
+        if not options:
+            raise CaseError(f"{where}: a scene needs at least one option")
+
+        summary = scene.get("summary")
+        if summary:
+            summary = (
+                _compile_line(summary["opening"], where),
+                _compile_tag(summary["lead_tag"], where),
+                _compile_line(summary["lead"], where),
+                tuple(_compile_tag(tag, where) for tag in summary.get("rest_tags", [])),
+                _compile_line(summary["rest"], where),
+                _compile_lines(summary.get("empty", []), where),
+            )
+
+        compiled_scenes.append((
+            scene_name,
+            _compile_lines(scene.get("lines", []), where),
+            _compile_notes(scene.get("findings", []), where),
+            summary,
+            _compile_line(scene.get("menu", ["plain", "What will you do?"]), where),
+            bool(scene.get("repeat_menu", True)),
+            tuple(options),
+            _compile_lines(scene.get("invalid", []), where),
+            _compile_choices(scene.get("options", []), where),
+            bool(scene.get("free_text", False)),
+            _compile_lines(scene.get("unlisted", []), where),
+        ))
+
+    compiled_endings = []
+    for ending_name, ending in endings.items():
+        where = f"{name}/{ending_name}"
+        _expect(ending, dict, where, "each ending")
+        compiled_endings.append((
+            ending_name,
+            bool(ending.get("win", False)),
+            _compile_lines(ending.get("lines", []), where),
+            tuple(_compile_lines(tier, where) for tier in _expect(ending.get("tiers", []), list, where, "tiers")),
+        ))
+
+    if data.get("start") not in scenes:
+        raise CaseError(f"{name}: 'start' has to name one of the scenes")
+
+    art = data.get("art")
+    if art:
+        style, art_lines = art
+        if style not in TEXT_STYLES:
+            raise CaseError(f"{name}/art: unknown style {style!r}")
+        art = (style, "\n".join(art_lines))
+
+    return (
+        name, digest,
+        data.get("title", name.upper()),
+        data["diagnosis"],
+        data.get("attending", "Dr. Crook"),
+        art or None,
+        _compile_lines(data.get("welcome", []), f"{name}/welcome"),
+        tuple(_expect(hint, str, f"{name}/hints", "each pearl") for hint in _expect(data.get("hints", []), list, name, "hints")),
+        _compile_lines(data.get("intro", []), f"{name}/intro"),
+        _compile_lines(data.get("outro", []), f"{name}/outro"),
+        index[data["start"]],
+        tuple(nodes),
+        tuple(compiled_scenes),
+        tuple(compiled_endings),
+    )
+
+def _inflate(compiled):
+    """Wraps the plain compiled tuples in namedtuples (and Notes) so the engine can read them"""
+    case = Case._make(compiled)
+    scenes = []
+    for raw in case.scenes:
+        scene = Scene._make(raw)
+        summary = Summary._make(scene.summary) if scene.summary else None
+        if summary:
+            summary = summary._replace(lead_tag=sys.intern(summary.lead_tag),
+                                       rest_tags=tuple(sys.intern(tag) for tag in summary.rest_tags))
+        scenes.append(scene._replace(
+            findings=tuple(Finding(*note) for note in scene.findings),
+            summary=summary,
+            options=tuple(Option._make(option)._replace(
+                findings=tuple(Finding(*note) for note in option[3]),
+                clues=tuple(Hint(*note) for note in option[4]),
+            ) for option in scene.options),
+        ))
+    endings = tuple(Ending._make(ending) for ending in case.endings)
+    return case._replace(scenes=tuple(scenes), endings=endings)
+
+def _write_cache(name, digest, compiled):
+    """Saves the compiled case (quietly gives up if the folder is read-only)"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for old in os.listdir(CACHE_DIR):
+            if old.startswith(name + "-") and old.endswith(".marshal"):
+                os.remove(os.path.join(CACHE_DIR, old))
+        path = os.path.join(CACHE_DIR, f"{name}-{digest}.marshal")
+        temp = path + f".{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            marshal.dump(compiled, f)
+        os.replace(temp, path)  # All or nothing, even with two games starting at once
+    except OSError:
+        pass
+
+_loaded_cases = {}
+
+def load_case(name):
+    """Loads cases/<name>.json, compiling it only if the cache is missing or stale"""
+    if name in _loaded_cases:
+        return _loaded_cases[name]
+
+    path = os.path.join(CASES_DIR, name + ".json")
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        raise CaseError(f"No case called {name!r} (try one of: {', '.join(list_cases())})") from None
+
+    digest = hashlib.sha256(raw + b"/%d" % CASE_FORMAT).hexdigest()[:16]
+    try:
+        with open(os.path.join(CACHE_DIR, f"{name}-{digest}.marshal"), "rb") as f:
+            compiled = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        try:
+            data = json.loads(raw.decode("utf-8"))
+            compiled = compile_case(name, data, digest)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Anything the checks above didn't see coming is still a broken case file, not a crash
+            raise CaseError(f"{name}: can't read case file ({type(e).__name__}: {e})") from None
+        _write_cache(name, digest, compiled)
+
+    case = _inflate(compiled)
+    _loaded_cases[name] = case
+    return case
+
+def list_cases():
+    """Names of every case in the cases/ folder (just a directory listing: nothing gets loaded)"""
+    return sorted(entry[:-5] for entry in os.listdir(CASES_DIR) if entry.endswith(".json"))
+
+def load_library():
+    """Loads every case at once (handy for checking them all)"""
+    return {name: load_case(name) for name in list_cases()}
+# ======= END CASE FILES =======
+
+# ======= DIAGNOSIS INDEX =======
+# In a scene with "free_text": true the student can just type the diagnosis
+# ("kawasaki", "kawasaky dz", "scarlatina") instead of picking a number. The
+# answer is looked up in cases/diagnoses.txt, a vocabulary of pediatric
+# diagnoses and their synonyms; misspelled words get fixed with a trigram index
+# of every word in it, so a typo is only compared with a handful of real words
+# instead of all of them. Whatever diagnosis the answer lands on picks the
+# option that has one of its names as an alias. Nothing is read until the
+# first time somebody types a diagnosis.
+DIAGNOSES_FILE = os.path.join(CASES_DIR, "diagnoses.txt")
+SHORTHAND = {"dz": "disease", "ds": "disease", "synd": "syndrome"}  # Chart-speak, expanded before the lookup
+MIN_TYPO_LENGTH = 4  # Shorter words have to be spelled right ("tb" is one typo from "ta")
+
+_APOSTROPHES = re.compile(r"['’]")
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+def normalize_answer(text):
+    """Lowercase words without punctuation (so "Conn's  Syndrome!" is "conns syndrome")"""
+    return " ".join(_PUNCTUATION.sub(" ", _APOSTROPHES.sub("", text.lower())).split())
+
+def typos_allowed(word):
+    """How far a word can be from the real thing and still count: 0, 1, or 2 for long words"""
+    if len(word) < MIN_TYPO_LENGTH:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+def edit_distance(a, b, limit=None):
+    """Damerau-Levenshtein (optimal string alignment) distance: how many typed,
+    dropped, changed or swapped-around letters turn a into b ("measels" is 1)
+
+    With a `limit` it gives up as soon as the answer is bound to be bigger
+    (and just returns limit + 1), which is most of the time for a typo.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    before, previous = None, list(range(len(b) + 1))
+    for i, letter in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (letter != other))
+            if before and j > 1 and letter == b[j - 2] and a[i - 2] == other:
+                cost = min(cost, before[j - 2] + 1)  # Two letters the wrong way round
+            current.append(cost)
+        # A swap reaches back two rows, so both have to be out of reach
+        if limit is not None and min(current) > limit and min(previous) >= limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1] if limit is None else min(previous[-1], limit + 1)
+
+TRIGRAMS_PER_TYPO = 4  # Most trigrams one typo can break ("measles" -> "measels" breaks 4)
+
+def trigrams(word):
+    """The word's three-letter pieces, padded so the ends count too ("kd" -> "  k", " kd", "kd ")"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TrigramIndex:
+    """Every word filed under its trigrams, for finding what a typo was meant to be
+
+    One typo only breaks the trigrams around it (3 at most, 4 for two swapped
+    letters), so the real word still shares nearly all of the rest with the
+    misspelling. Counting shared trigrams narrows thousands of words down to a
+    few, and only those few get the (slow, pure Python) edit distance. Words are filed by length too, so
+    the counting never even looks at words that are too long or too short.
+    """
+
+    def __init__(self, words=()):
+        self.postings = {}  # (trigram, word length) -> every word that has it
+        for word in words:
+            for gram in trigrams(word):
+                self.postings.setdefault((gram, len(word)), []).append(word)
+
+    def closest(self, word, limit):
+        """The nearest word at most `limit` typos away (None if nothing is that close)"""
+        grams = trigrams(word)
+        shared = Counter()
+        for length in range(len(word) - limit, len(word) + limit + 1):
+            for gram in grams:
+                shared.update(self.postings.get((gram, length), ()))
+        needed = len(grams) - TRIGRAMS_PER_TYPO * limit  # Anything sharing fewer is too many typos away
+        # Most trigrams in common first (then A-Z, so ties always go the same way)
+        candidates = sorted((-count, candidate) for candidate, count in shared.items() if count >= needed)
+        best, best_distance = None, limit + 1
+        for count, candidate in candidates:
+            if -count < len(grams) - TRIGRAMS_PER_TYPO * (best_distance - 1):
+                break  # Nothing from here on can beat the one we've got
+            distance = edit_distance(word, candidate, best_distance - 1)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return best
 
-def provide_hint(current_case="kawasaki"):
+class DiagnosisIndex:
+    """The vocabulary from cases/diagnoses.txt: every name it knows -> its diagnosis"""
+
+    def __init__(self, lines):
+        self.names = {}     # Normalized name or synonym -> the diagnosis (the first name on its line)
+        self.synonyms = {}  # Diagnosis -> every normalized name it goes by
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [normalize_answer(name) for name in line.split("|")]
+            diagnosis = line.split("|")[0].strip()
+            self.synonyms[diagnosis] = tuple(name for name in names if name)
+            for name in self.synonyms[diagnosis]:
+                self.names.setdefault(name, diagnosis)
+        self.words = {word for name in self.names for word in name.split()}
+        self.longest = max((len(name.split()) for name in self.names), default=0)
+        # Too-short words are never a typo's fix either ("coat" isn't "coa", coarctation)
+        self.typos = TrigramIndex(word for word in sorted(self.words) if typos_allowed(word))
+        self.fixes = {}  # Typo -> what it turned out to be (the same typos come up a lot)
+
+    def lookup(self, text):
+        """The diagnosis a free-text answer means (None if it isn't one we know)"""
+        words = [SHORTHAND.get(word, word) for word in normalize_answer(text).split()]
+        found = self._find(words)
+        if found is None:
+            found = self._find([self._correct(word) for word in words])
+        return found
+
+    def _correct(self, word):
+        """The vocabulary word the student was going for (or the word itself)"""
+        if word in self.words or not typos_allowed(word):
+            return word
+        if word not in self.fixes:
+            self.fixes[word] = self.typos.closest(word, typos_allowed(word)) or word
+        return self.fixes[word]
+
+    def _find(self, words):
+        """The longest run of words that's a name we know ("i think its kawasaki disease")"""
+        for size in range(min(len(words), self.longest), 0, -1):
+            for start in range(len(words) - size + 1):
+                diagnosis = self.names.get(" ".join(words[start:start + size]))
+                if diagnosis:
+                    return diagnosis
+        return None
+
+_diagnosis_index = None
+
+def diagnosis_index():
+    """The vocabulary, read and indexed the first time it's needed"""
+    global _diagnosis_index
+    if _diagnosis_index is None:
+        try:
+            with open(DIAGNOSES_FILE, encoding="utf-8") as f:
+                _diagnosis_index = DiagnosisIndex(f)
+        except FileNotFoundError:
+            _diagnosis_index = DiagnosisIndex(())  # No vocabulary: free text falls back to the aliases
+    return _diagnosis_index
+
+@hooked("decision")
+def match_diagnosis(game, scene, answer):
+    """What a typed diagnosis picks: (option index or None, the diagnosis or None)
+
+    An index means one of the option's aliases is a name of that diagnosis.
+    A diagnosis without an index is a real one that just isn't on the menu.
+    """
+    index = diagnosis_index()
+    diagnosis = index.lookup(answer)
+    if diagnosis is None:
+        return None, None
+    for name in index.synonyms[diagnosis]:
+        if name in scene.choices:
+            return scene.choices[name], diagnosis
+    return None, diagnosis
+# ======= END DIAGNOSIS INDEX =======
+
+# ======= HINT SYSTEM =======
+# Clinical pearls now live in each case file (see the "hints" list in cases/*.json)
+
+max_hints = 3  # Per game (each GameState tracks its own hints_used)
+
+class HintDeck:
+    """One student's shuffled deck of a case's pearls
+
+    Shuffled once, then dealt off the top, so every draw is O(1) instead of
+    rebuilding the list of unseen pearls each time. Pearls the student already
+    saw (say, before a resume) are skipped. Once the deck runs out, any pearl
+    can come up again.
+    """
+
+    def __init__(self, pearls, rng=random, seen=()):
+        self.pearls = pearls
+        self.rng = rng
+        self.seen = set(seen)  # Pearl texts this student has been shown
+        self.cards = list(range(len(pearls)))
+        rng.shuffle(self.cards)
+
+    def draw(self):
+        """Deals a pearl: (index, True) for a new one, (index, False) for a repeat,
+        or (None, False) if the case has no pearls at all"""
+        while self.cards:
+            index = self.cards.pop()
+            if self.pearls[index] not in self.seen:
+                self.seen.add(self.pearls[index])
+                return index, True
+        if not self.pearls:
+            return None, False
+        return self.rng.randrange(len(self.pearls)), False
+
+@hooked("decision")
+async def provide_hint(game):
     """Provides a clinical pearl hint for the current case"""
-    global hints_used
-    if hints_used >= max_hints:
-        type_text("⚠️ NO MORE HINTS!", color=Color.RED)
+    if game.hints_used >= max_hints:
+        await type_text(game, "⚠️ NO MORE HINTS!", color=Color.RED)
         return
         
-    hints_used += 1
-    remaining = max_hints - hints_used
+    game.hints_used += 1
+    remaining = max_hints - game.hints_used
     
-    # Get a random hint that hasn't been used yet (if possible)
-    used_hints = player.get("hints_received", [])
-    available_hints = [h for h in hints_dict.get(current_case.lower(), []) if h not in used_hints]
-    
-    # If we've used all unique hints, just get a random one
-    if not available_hints and hints_dict.get(current_case.lower()):
-        hint = random.choice(hints_dict[current_case.lower()])
-    elif available_hints:
-        hint = random.choice(available_hints)
-        # Track this hint as used
-        if "hints_received" not in player:
-            player["hints_received"] = []
-        player["hints_received"].append(hint)
+    # Deal the next pearl this student hasn't seen yet
+    if game.hint_deck is None:
+        game.hint_deck = HintDeck(game.case.hints, game.rng, seen=game.player["hints_received"])
+    index, new = game.hint_deck.draw()
+    if index is not None:
+        hint = game.case.hints[index]
+        if new:
+            game.player["hints_received"].append(hint)
     else:
         hint = "Focus on the pattern of symptoms and their timing. Consider the patient demographics."
     
+    if game.log:
+        game.log.hint(game.node, index)
+    if game.save:
+        game.save.checkpoint(game)  # Quitting now mustn't hand the hint back
+    
     # Display the hint with proper formatting
-    print_divider()
-    type_text(f"💡 CLINICAL PEARL ({remaining} hints remaining)", color=Color.GREEN + Color.BOLD)
-    type_text(f"{hint}", color=Color.GREEN)
-    print_divider()
+    print_divider(game)
+    await type_text(game, f"💡 CLINICAL PEARL ({remaining} hints remaining)", color=Color.GREEN + Color.BOLD)
+    await type_text(game, f"{hint}", color=Color.GREEN)
+    print_divider(game)
 # ======= END HINT SYSTEM =======
 
-def clear_screen():
+@hooked("render")
+def clear_screen(game):
     """Clears the terminal screen for better readability"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if is_instant():
+        return  # Headless runs keep the whole transcript
+    if game.panel.pinned:
+        game.panel.clear_below()
+    else:
+        game.screen.write(Cursor.CLEAR_SCREEN + Cursor.HOME)
+        game.panel.fields = None  # The stats went with it, so the next scene shows them in full
 
-def type_text(text, delay=0.02, pause=0.5, color=None):
+@hooked("render")
+async def type_text(game, text, delay=0.02, pause=0.5, color=None):
     """Makes text appear dramatically like in classic RPGs with better pacing"""
+    if game.screen.muted:
+        return
     text = str(text).replace('\n', ' ').strip()
     text = ' '.join(text.split())
     
+    if not game.screen.profile.color:
+        color = None  # Don't even send the codes
     if color:
-        print(color, end='')
+        game.screen.write(color)  # Rides along with the first frame
     
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
+    await game.screen.typewrite(text, delay)
     
     if color:
-        print(Color.RESET, end='')
+        game.screen.write(Color.RESET)
     
-    print("\n")  # Clean line ending
-    time.sleep(pause)
+    game.screen.write("\n\n")  # Clean line ending
+    game.screen.flush()
+    await game.screen.pause(pause)
 
-def print_divider():
+def divider_lines(game):
+    """The divider as separate screen lines (blank, sparkles, blank)"""
+    return list(frame(game.screen.profile, "divider", _divider))
+
+@hooked("render")
+def print_divider(game):
     """Adds a pretty divider to separate sections (like in Zelda text boxes!)"""
-    print("\n" + Color.CYAN + "✨" + "="*48 + "✨" + Color.RESET + "\n")
+    game.screen.write_frame(frame(game.screen.profile, "divider text", _divider_text))
 
-def scene_transition():
+@hooked("render")
+async def scene_transition(game):
     """Dramatic pause between scenes (with user confirmation before clearing!)"""
-    input(f"\n{Color.CYAN}[Press Enter to continue...]{Color.RESET}\n")
-    clear_screen()  # Only clear AFTER the player confirms they're ready
-
-# Game state variables (our patient chart, if you will! 📊)
-player = {
-    "name": "",
-    "anxiety": 0,
-    "correct_choices": 0,
-    "reputation": 50,
-    "diagnosis_hints": [],
-    "findings": [],  # Track what the player has actually found
-    "hints_received": []  # Track which hints the player has seen
-}
+    if is_instant():
+        return  # Nobody's there to press Enter, so just keep going
+    keys = game.screen.keys
+    if keys:
+        keys.stop()  # Catches anything typed right up to now
+        if keys.lines:
+            clear_screen(game)  # They've already typed their next answer: no need to wait for Enter
+            return
+    await ask(game, f"\n{Color.CYAN}[Press Enter to continue...]{Color.RESET}\n")
+    clear_screen(game)  # Only clear AFTER the player confirms they're ready
 
-def print_stats():
-    """Displays current player stats with nice formatting"""
-    print_divider()
-    print(f"{Color.BOLD}Dr. {player['name']}'s Status:{Color.RESET}")
-    print(f"Anxiety Level: {'😰' * (player['anxiety'] // 10)}")
-    print(f"Reputation with Dr. Crook: {'⭐' * (player['reputation'] // 10)}")
-    print(f"Correct Clinical Decisions: {player['correct_choices']}")
+# ======= GAME STATE =======
+def new_player(name=""):
+    """A fresh patient chart for the player, if you will! 📊"""
+    return {
+        "name": name,
+        "anxiety": 0,
+        "correct_choices": 0,
+        "reputation": 50,
+        "diagnosis_hints": [],
+        "findings": [],  # Track what the player has actually found
+        "hints_received": []  # Track which hints the player has seen
+    }
+
+class GameState:
+    """Everything one student's playthrough needs, so one process can host many students"""
+
+    def __init__(self, case, stream=None, readline=read_stdin, sleep=blocking_sleep, muted=False, seed=None,
+                 profile=None):
+        self.case = case              # The Case being played (see load_case)
+        self.player = new_player()
+        self.hints_used = 0
+        self.rng = random.Random(seed)  # Same seed, same pearls (handy for tests and simulations)
+        self.hint_deck = None         # Shuffled the first time the student asks for a hint
+        self.findings_by_tag = {}     # The same Findings as player["findings"], grouped by tag
+        self.node = None              # Index of the scene being played (None during the intro)
+        self.charted = None           # The scene whose own findings are already in the chart
+        self.screen = Renderer(stream, sleep, muted=muted, profile=profile)
+        self.panel = StatusPanel(self.screen)
+        self.readline = readline      # async "give me the next line the student typed"
+        self.log = None               # An EventLog (see ddxcrook_log.py) if we're recording
+        self.save = None              # A SaveFile (see ddxcrook_save.py) if we're checkpointing
+
+    @property
+    def probe(self):
+        """Whatever is timing this game (see INSTRUMENTATION), or None"""
+        return self.screen.probe
+
+    @probe.setter
+    def probe(self, probe):
+        if probe is not None:
+            install_hooks()
+        self.screen.probe = probe  # The Renderer reports the pauses
+# ======= END GAME STATE =======
+
+def stats_lines(game):
+    """Builds the stats block one screen line at a time"""
+    profile = game.screen.profile
+    lines = divider_lines(game)
+    lines.append(paint(profile, Color.BOLD, f"Dr. {game.player['name']}'s Status:"))
+    lines.append(f"Anxiety Level: {'😰' * (game.player['anxiety'] // 10)}")
+    lines.append(f"Reputation with {game.case.attending}: {'⭐' * (game.player['reputation'] // 10)}")
+    lines.append(f"Correct Clinical Decisions: {game.player['correct_choices']}")
     
     # Show diagnosis hints if we have any
-    if player['diagnosis_hints']:
-        print(f"\n{Color.CYAN}Diagnosis Clues: 🔍{Color.RESET}")
-        for hint in player['diagnosis_hints']:
-            print(f"  • {hint}")
+    if game.player['diagnosis_hints']:
+        lines.append("")
+        lines.append(paint(profile, Color.CYAN, "Diagnosis Clues: 🔍"))
+        for hint in game.player['diagnosis_hints']:
+            lines.append(f"  • {hint}")
     
     # Show available help options
-    print(f"\n{Color.CYAN}Available Actions:{Color.RESET}")
-    print(f"  • Type your choice number as usual")
-    print(f"  • Type 'hint' to get a clinical pearl ({max_hints - hints_used} remaining)")
+    lines.append("")
+    lines.append(paint(profile, Color.CYAN, "Available Actions:"))
+    lines.append(f"  • Type your choice number as usual")
+    lines.append(f"  • Type 'hint' to get a clinical pearl ({max_hints - game.hints_used} remaining)")
     
-    print_divider()
+    return lines + divider_lines(game)
 
-def first_decision():
-    """First interaction with Dr. Crook about the new patient"""
-    print_stats()
-    
-    type_text("What would you like to do?", color=Color.CYAN)
-    print("\n1. Ask about the vital signs")
-    print("2. Review the chart first")
-    print("3. Go see the patient immediately")
-    print("4. Pretend you didn't hear and keep typing notes*")
-    
-    while True:
-        choice = input("\nYour choice (1-4 or 'hint'): ").lower().strip()
-        
-        if choice == "hint":
-            provide_hint()
-            continue
-            
-        elif choice == "1":
-            type_text("Dr. Crook raises an eyebrow, seemingly impressed by your initiative.", color=Color.GREEN)
-            type_text("'Temperature 39.8°C, HR 130, RR 28, BP 95/60. Make of that what you will.'", color=Color.YELLOW)
-            
-            # Add these findings to our tracking
-            player["findings"].append("Temp 39.8°C, HR 130, RR 28, BP 95/60")
-            
-            player["correct_choices"] += 1
-            player["diagnosis_hints"].append("High fever with tachycardia")
-            
-            # Internal thought
-            type_text("(Your brain: 'High fever in a kid... infections, rheumatic fever, maybe something auto-inflammatory?')", color=Color.PURPLE)
-            
-            scene_transition()
-            second_decision()
-            break
-        elif choice == "2":
-            type_text("Dr. Crook sighs dramatically. 'Did I not JUST mention... interesting VITALS? These kids don't have all day, doctor.'", color=Color.RED)
-            player["reputation"] -= 5
-            
-            # Internal thought
-            type_text("(Your brain: 'Great start. Really nailing this whole doctor thing.')", color=Color.PURPLE)
-            continue
-        elif choice == "3":
-            type_text("Dr. Crook blocks your path with surprising agility.", color=Color.RED)
-            type_text("'Hold up there, speed racer. Perhaps some... pertinent information first?'", color=Color.YELLOW)
-            player["anxiety"] += 10
-            
-            # Internal thought
-            type_text("(Your brain: 'Ah yes, the classic medical student blunder: enthusiasm without information.')", color=Color.PURPLE)
-            continue
-        elif choice == "4":
-            type_text("*Your typing intensifies nervously*", color=Color.RED)
-            type_text("Dr. Crook: 'I can see you typing 'HELP ME PLEASE' repeatedly.'", color=Color.YELLOW)
-            type_text("'And is that... Zelda you're playing on an emulator? In the pediatric ward?'", color=Color.YELLOW)
-            player["anxiety"] += 20
-            player["reputation"] -= 10
-            
-            # Internal thought
-            type_text("(Your brain: 'Maybe if I type fast enough, I'll time travel to graduation...')", color=Color.PURPLE)
-            continue
-        else:
-            type_text("Dr. Crook frowns. 'That wasn't one of the options, doctor. Kids' health is at stake here.'", color=Color.RED)
+def stats_fields(game):
+    """The numbers behind the stats block (what the one-line updates compare)"""
+    return {
+        "anxiety": game.player["anxiety"],
+        "reputation": game.player["reputation"],
+        "correct_choices": game.player["correct_choices"],
+        "clues": len(game.player["diagnosis_hints"]),
+        "hints_left": max_hints - game.hints_used,
+    }
 
-def second_decision():
-    """Second decision point after learning about vitals"""
-    print_stats()
-    
-    # Remind the player of the vitals they just learned
-    type_text("Dr. Crook taps his clipboard thoughtfully. 'So, given these vitals in a 5-year-old... Temp 39.8°C, HR 130, RR 28, BP 95/60...'", color=Color.YELLOW)
-    
-    while True:
-        print("\nWhat's your next move?")
-        print("\n1. 'How long has the fever persisted?'")
-        print("2. *Frantically google 'kid fever fast heart' on your phone*")
-        print("3. 'PEDS RAPID RESPONSE!' *Reaches for the emergency button*")
-        print("4. 'Let me examine the patient for any rashes or physical findings'")
-        
-        choice = input("\nYour choice (1-4 or 'hint'): ").lower().strip()
-        
-        if choice == "hint":
-            provide_hint()
-            continue
-            
-        elif choice == "1":
-            type_text("'Finally asking the right questions!' Dr. Crook's eyes light up.", color=Color.GREEN)
-            type_text("'Fever for 5 days now, started at 38.5°C but has been persistently above 39°C'", color=Color.YELLOW)
-            type_text("'Tylenol and Motrin barely touching it. Parents are appropriately freaking out.'", color=Color.YELLOW)
-            
-            # Add to our findings
-            player["findings"].append("5 days of persistent fever >39°C, poorly responsive to antipyretics")
-            
-            player["correct_choices"] += 1
-            player["reputation"] += 10
-            player["diagnosis_hints"].append("Persistent high fever >5 days")
-            
-            # Internal thought
-            type_text("(Your brain: 'Five days of fever resistant to antipyretics... definitely narrowing the differential.')", color=Color.PURPLE)
-            
-            scene_transition()
-            third_decision()
-            break
-        elif choice == "2":
-            type_text("Dr. Crook: 'Your phone's UpToDate history is... illuminating.'", color=Color.RED)
-            type_text("'Let me see... ah yes, \"OMG HELP FEVER KID DYING\" - very professional, doctor.'", color=Color.YELLOW)
-            player["anxiety"] += 15
-            
-            # Internal thought
-            type_text("(Your brain: 'Maybe I should've gone with the less conspicuous \"kid fever not clickbait\" search.')", color=Color.PURPLE)
-            continue
-        elif choice == "3":
-            type_text("Dr. Crook physically blocks your path to the button with impressive reflexes.", color=Color.RED)
-            type_text("'Let's not alert the ENTIRE PEDIATRIC FLOOR just yet, shall we?'", color=Color.YELLOW)
-            player["anxiety"] += 25
-            player["reputation"] -= 15
-            
-            # Internal thought
-            type_text("(Your brain: 'I swear attendings have a sixth sense for detecting when students are about to do something dumb.')", color=Color.PURPLE)
-            continue
-        elif choice == "4":
-            type_text("Dr. Crook raises an eyebrow. 'Eager to examine, I see. But perhaps we should learn more about the history first?'", color=Color.YELLOW)
-            type_text("'In pediatrics, a detailed history often guides our physical exam. Let's start there.'", color=Color.YELLOW)
-            
-            # Internal thought
-            type_text("(Your brain: 'Right... history before physical. Med School 101. Nailing it.')", color=Color.PURPLE)
-            
-            continue
-        else:
-            type_text("Dr. Crook: 'That wasn't one of the options. Again. Kids deserve better focus.'", color=Color.RED)
+STAT_LABELS = (("anxiety", "Anxiety"), ("reputation", "Reputation"),
+               ("correct_choices", "Correct Decisions"), ("hints_left", "Pearls left"))
 
-def third_decision():
-    """Third decision point - examining the patient (with a more comprehensive option)"""
-    print_stats()
-    
-    type_text("You enter the patient's room with Dr. Crook. A miserable-looking 5-year-old boy lies in bed.", color=Color.BLUE)
-    type_text("His mother looks up anxiously. 'Is there any news, doctors?'", color=Color.BLUE)
-    type_text("Dr. Crook turns to you expectantly. 'Dr. " + player["name"] + " would like to examine your son.'", color=Color.YELLOW)
-    
-    # Internal thought
-    type_text("(Your brain: 'No pressure. Just don't mess up in front of the kid, the parent, AND Dr. Crook...')", color=Color.PURPLE)
-    
-    while True:
-        print("\nHow will you approach the physical exam?")
-        print("\n1. 'I'll perform a systematic head-to-toe exam focusing on the diagnostic features of pediatric inflammatory conditions'")
-        print("2. Look for specific findings: rashes, oral changes, eye redness, lymph nodes")
-        print("3. Focus primarily on the cardiac and respiratory systems")
-        print("4. Ask the mother about recent exposures before examining")
-        
-        choice = input("\nYour choice (1-4 or 'hint'): ").lower().strip()
-        
-        if choice == "hint":
-            provide_hint()
-            continue
-            
-        elif choice == "1":
-            # Only choice 1 is correct now - matches the systematic approach a clinician should take
-            type_text("Dr. Crook nods approvingly. 'A systematic approach. Very good.'", color=Color.GREEN)
-            type_text("Your examination reveals:", color=Color.CYAN)
-            print(Color.BOLD + "• Bilateral conjunctival injection without exudate" + Color.RESET)
-            print(Color.BOLD + "• Erythema of the lips with a strawberry tongue appearance" + Color.RESET)
-            print(Color.BOLD + "• Polymorphous rash over the trunk" + Color.RESET)
-            print(Color.BOLD + "• Erythema and edema of the hands and feet" + Color.RESET)
-            print(Color.BOLD + "• A single enlarged right cervical lymph node (approximately 1.5 cm)" + Color.RESET)
-            print()  # Extra spacing for readability
-            
-            # Add all these findings to our tracking
-            player["findings"].extend([
-                "bilateral conjunctival injection",
-                "erythema of lips and strawberry tongue",
-                "polymorphous rash",
-                "erythema and edema of hands and feet", 
-                "unilateral cervical lymphadenopathy"
-            ])
-            
-            player["correct_choices"] += 2
-            player["reputation"] += 10
-            
-            # Add several diagnosis hints based on the comprehensive exam
-            player["diagnosis_hints"].append("Mucocutaneous findings: polymorphic rash, conjunctival injection")
-            player["diagnosis_hints"].append("Extremity changes: red, edematous hands and feet")
-            player["diagnosis_hints"].append("Oral changes: red lips and strawberry tongue")
-            player["diagnosis_hints"].append("Unilateral cervical lymphadenopathy >1.5cm")
-            
-            # Internal thought
-            type_text("(Your brain: 'These are the classic findings! Febrile kid, rash, red eyes, oral changes, extremity changes, lymphadenopathy...')", color=Color.PURPLE)
-            
-            scene_transition()
-            fourth_decision()
-            break
-            
-        elif choice == "2":
-            type_text("Dr. Crook watches you. 'While those are important areas, a more structured approach would be better.'", color=Color.YELLOW)
-            type_text("'Remember what we learned about systematic examination in pediatric patients.'", color=Color.YELLOW)
-            
-            # Internal thought
-            type_text("(Your brain: 'I need to be more organized in my approach to pick up all the findings...')", color=Color.PURPLE)
-            
-            continue
-            
-        elif choice == "3":
-            type_text("You focus on auscultating the heart and lungs.", color=Color.BLUE)
-            type_text("Dr. Crook observes your technique, then gently suggests, 'Perhaps we should be more systematic in our approach.'", color=Color.YELLOW)
-            type_text("'Remember, in pediatrics, the skin and mucous membranes often hold the diagnostic keys.'", color=Color.YELLOW)
-            
-            # Internal thought
-            type_text("(Your brain: 'Right... look at the whole patient, not just the vital organs.')", color=Color.PURPLE)
-            
-            continue
-            
-        elif choice == "4":
-            type_text("You turn to the mother: 'Has he been around anyone sick recently? Any travel?'", color=Color.BLUE)
-            type_text("The mother shakes her head. 'No travel. He was at daycare until the fever started.'", color=Color.BLUE)
-            type_text("'No one else is sick that we know of. He's up-to-date on vaccines.'", color=Color.BLUE)
-            type_text("Dr. Crook gives you a look. 'Good background, but perhaps we should examine the patient now?'", color=Color.YELLOW)
-            
-            # Add this epidemiological finding
-            player["findings"].append("No travel history, attends daycare, vaccinations up-to-date")
-            
-            # Internal thought
-            type_text("(Your brain: 'Right... I should probably look at the actual patient.')", color=Color.PURPLE)
-            
-            continue
-            
+def stats_update(game, old, new):
+    """Just what changed since the stats were last shown, in a line or two"""
+    changed = [f"{label} {new[key]} ({new[key] - old[key]:+d})"
+               for key, label in STAT_LABELS if new[key] != old[key]]
+    lines = [paint(game.screen.profile, Color.CYAN, "📊 " + (" | ".join(changed) or "No change in your stats"))]
+    for clue in game.player["diagnosis_hints"][old["clues"]:]:
+        lines.append(paint(game.screen.profile, Color.CYAN, "🔍 New clue: ") + str(clue))
+    return lines + [""]
+
+@hooked("render")
+def print_stats(game):
+    """Displays current player stats with nice formatting"""
+    if game.screen.muted:
+        return
+    lines = stats_lines(game)
+    fields = stats_fields(game)
+    if game.panel.fields is not None and not game.panel.can_pin(lines):
+        # The whole block is already up there once: don't send every clue again
+        lines = stats_update(game, game.panel.fields, fields)
+        for line in lines:
+            game.screen.print(line)
+    else:
+        if game.screen.downgrade:
+            # Trimmed before the panel compares lines, so unchanged ones still get skipped
+            lines = [game.screen.downgrade(line) for line in lines]
+        game.panel.draw(lines)
+    game.panel.fields = fields
+
+# ======= SCENE ENGINE =======
+# Every scene plays out from the case file and hands back the index of the node
+# that comes next, and play() just loops. Stack depth stays the same no matter
+# how many decisions (or wrong answers!) a rotation takes.
+SCORE_TIERS = (100, 50)  # Beat these for the best and second-best endings
+
+def final_score(stats):
+    """Our patented (and only slightly arbitrary) grading formula"""
+    return stats["correct_choices"] * 10 + stats["reputation"] - stats["anxiety"]
+
+def score_tier(score):
+    """0 for the top tier, 1 for the next one... len(SCORE_TIERS) for 'you got there'"""
+    for tier, threshold in enumerate(SCORE_TIERS):
+        if score > threshold:
+            return tier
+    return len(SCORE_TIERS)
+
+def fill(game, text, **extra):
+    """Drops player details into case text ('Dr. {name}' and friends)"""
+    return text.format_map(dict(game.player, **extra))
+
+@hooked("render")
+async def show_lines(game, lines, **extra):
+    """Plays case lines: typed-out dialogue, or a bold panel that appears at once"""
+    for style, text in lines:
+        if style == "panel":
+            # Extra blank line after it for readability
+            game.screen.write_frame(frame(game.screen.profile, ("panel", text), _panel(text)))
         else:
-            type_text("Dr. Crook whispers. 'Focus, doctor. The options are right there.'", color=Color.RED)
+            await type_text(game, fill(game, text, **extra), color=None if style == "plain" else getattr(Color, style.upper()))
 
-def fourth_decision():
-    """Fourth decision point - diagnostic approach"""
-    print_stats()
-    
-    # Now Dr. Crook only mentions findings the player actually discovered!
-    if player["findings"]:
-        type_text("Back at the nursing station, Dr. Crook asks, 'So what's your diagnostic approach?'", color=Color.YELLOW)
-        
-        # Create a summary of the findings for Dr. Crook to mention
-        # First, get the fever duration finding
-        fever_finding = next((f for f in player["findings"] if "fever" in f.lower()), "")
-        
-        # Then get the physical exam findings
-        exam_findings = [f for f in player["findings"] if f not in ["Temp 39.8°C, HR 130, RR 28, BP 95/60", fever_finding] and "no travel" not in f.lower()]
-        
-        if fever_finding:
-            type_text(f"'We have a 5-year-old with {fever_finding},'", color=Color.YELLOW)
-        
-        if exam_findings:
-            # Format the physical findings nicely
-            if len(exam_findings) > 1:
-                formatted_findings = ", ".join(exam_findings[:-1]) + ", and " + exam_findings[-1]
-            else:
-                formatted_findings = exam_findings[0]
-                
-            type_text(f"'Plus physical findings of {formatted_findings}.'", color=Color.YELLOW)
+@hooked("render")
+async def show_menu(game, scene):
+    """Prints the scene's question and numbered options"""
+    style, title = scene.menu
+    if style == "plain":
+        game.screen.print("\n" + title)
     else:
+        await show_lines(game, [scene.menu])
+    for number, option in enumerate(scene.options, 1):
+        game.screen.print(("\n" if number == 1 else "") + f"{number}. {option.label}")
+
+@hooked("render")
+async def summarize_findings(game, summary):
+    """Has the attending recap only what the player actually found"""
+    if not game.player["findings"]:
         # Fallback if somehow no findings were recorded
-        type_text("Back at the nursing station, Dr. Crook reviews the patient's presentation.", color=Color.YELLOW)
-        type_text("'Let's consider what we know about this febrile 5-year-old.'", color=Color.YELLOW)
-    
-    # Internal thought
-    type_text("(Your brain is racing through differentials: 'Scarlet fever? Measles? Stevens-Johnson? Wait... Kawasaki?')", color=Color.PURPLE)
-    
-    while True:
-        print("\nWhat tests would you order?")
-        print("\n1. 'CBC with differential, CRP, ESR, and echocardiogram'")
-        print("2. 'Blood culture, throat culture, and lumbar puncture'")
-        print("3. 'Rapid strep test and mono spot'")
-        print("4. 'CT scan of the head and chest X-ray'")
-        
-        choice = input("\nYour choice (1-4 or 'hint'): ").lower().strip()
-        
-        if choice == "hint":
-            provide_hint()
-            continue
-            
-        elif choice == "1":
-            type_text("Dr. Crook's eyes widen with visible approval.", color=Color.GREEN)
-            type_text("'Excellent choices. Also consider LFTs and urinalysis. Let's monitor those platelets.'", color=Color.YELLOW)
-            
-            # Add these tests to our findings
-            player["findings"].append("Ordered: CBC with diff, CRP, ESR, LFTs, UA, and echocardiogram")
-            
-            player["correct_choices"] += 2
-            player["reputation"] += 15
-            player["diagnosis_hints"].append("Ordered appropriate inflammatory markers and echo")
-            
-            # Internal thought
-            type_text("(Your brain: 'Wait, did I just... impress Dr. Crook? Is this real life?')", color=Color.PURPLE)
-            
-            scene_transition()
-            final_diagnosis()
-            break
-            
-        elif choice == "2":
-            type_text("Dr. Crook tilts his head. 'Infection workup is reasonable, but lumbar puncture?'", color=Color.RED)
-            type_text("'No meningeal signs here. Think broader about the constellation of symptoms.'", color=Color.YELLOW)
-            player["reputation"] -= 5
-            
-            # Internal thought
-            type_text("(Your brain: 'Great, now I'm the med student who wants to do unnecessary LPs on children...')", color=Color.PURPLE)
-            
-            continue
-            
-        elif choice == "3":
-            type_text("'Limited testing for a complex presentation. Think bigger picture, doctor.'", color=Color.RED)
-            type_text("'This child has multiple systems involved. What might we be missing?'", color=Color.YELLOW)
-            
-            # Internal thought
-            type_text("(Your brain: 'The number of ways to look incompetent seems infinite...')", color=Color.PURPLE)
-            
-            continue
-            
-        elif choice == "4":
-            type_text("Dr. Crook raises both eyebrows to stratospheric heights.", color=Color.RED)
-            type_text("'Irradiating a child should never be our first approach. What else could we do?'", color=Color.YELLOW)
-            player["anxiety"] += 10
-            
-            # Internal thought
-            type_text("(Your brain: 'Note to self: Don't suggest CT scans for children unless absolutely necessary...')", color=Color.PURPLE)
-            
-            continue
-            
+        await show_lines(game, summary.empty)
+        return
+
+    await show_lines(game, [summary.opening])
+
+    # First the finding the recap leads with (the fever history, for Kawasaki)...
+    lead = next(iter(game.findings_by_tag.get(summary.lead_tag, ())), None)
+    # ...then everything with one of the rest_tags (the exam findings)
+    rest = [f.text for tag in summary.rest_tags for f in game.findings_by_tag.get(tag, ()) if f is not lead]
+
+    if lead:
+        await show_lines(game, [summary.lead], finding=lead.text)
+    if rest:
+        # Format the findings nicely
+        if len(rest) > 1:
+            formatted = ", ".join(rest[:-1]) + ", and " + rest[-1]
         else:
-            type_text("Dr. Crook sighs. 'Please focus on the options at hand.'", color=Color.RED)
+            formatted = rest[0]
+        await show_lines(game, [summary.rest], findings=formatted)
 
-def final_diagnosis():
-    """Final diagnostic moment"""
-    print_stats()
-    
-    # Display test results prominently
-    type_text("The next day, Dr. Crook approaches with the test results.", color=Color.YELLOW)
-    
-    print(Color.BOLD + "\n📋 LABORATORY RESULTS:" + Color.RESET)
-    print(Color.BOLD + "- CRP: 120 mg/L (ref: <5)" + Color.RESET)
-    print(Color.BOLD + "- ESR: 80 mm/h (ref: <15)" + Color.RESET)
-    print(Color.BOLD + "- WBC: 15.5 x10^9/L with neutrophilia" + Color.RESET)
-    print(Color.BOLD + "- Hgb: 10.8 g/dL (mild anemia)" + Color.RESET)
-    print(Color.BOLD + "- Platelets: 450,000 (elevated)" + Color.RESET)
-    print(Color.BOLD + "- ALT: 85 U/L, AST: 70 U/L (mild transaminitis)" + Color.RESET)
-    print(Color.BOLD + "- Echo: Pending" + Color.RESET)
-    print()
-    
-    type_text("Dr. Crook looks at you expectantly. 'Care to make your diagnosis?'", color=Color.YELLOW)
-    
-    # Add lab results to our findings
-    player["findings"].append("Labs: Elevated CRP/ESR, leukocytosis, mild anemia, thrombocytosis, mild transaminitis")
-    
-    # Internal thought
-    type_text("(Your heart is pounding. 'This is it. Don't mess up now...')", color=Color.PURPLE)
-    
+def add_findings(game, findings):
+    """Charts new findings (and files them under their tags for the summaries)"""
+    game.player["findings"].extend(findings)
+    for finding in findings:
+        game.findings_by_tag.setdefault(finding.tag, []).append(finding)
+
+@hooked("decision")
+def apply_option(game, option):
+    """Updates the chart with everything an option changes"""
+    for stat, delta in zip(STATS, option.effects):
+        game.player[stat] += delta
+    add_findings(game, option.findings)
+    game.player["diagnosis_hints"].extend(option.clues)
+
+@hooked("decision")
+async def choose(game, scene):
+    """The choice prompt: keeps asking until the student picks one of the options
+
+    Answers are looked up in the scene's choice table (number, letter or
+    keyword, see _compile_choices). The menu was shown when the scene started
+    and only comes back after an answer we don't understand. In a free_text
+    scene anything else is looked up as a diagnosis (see DIAGNOSIS INDEX).
+    Returns the option's index.
+    """
+    if scene.free_text:
+        prompt = f"\nYour choice (1-{len(scene.options)}, 'hint' or type your diagnosis): "
+    else:
+        prompt = f"\nYour choice (1-{len(scene.options)} or 'hint'): "
     while True:
-        print("\nWhat's your diagnosis?")
-        print("\n1. 'This patient has Kawasaki Disease'")
-        print("2. 'I believe this is Scarlet Fever'")
-        print("3. 'The patient has Juvenile Idiopathic Arthritis with systemic features'")
-        print("4. 'I need more tests before making a diagnosis'")
-        
-        choice = input("\nYour choice (1-4 or 'hint'): ").lower().strip()
-        
+        choice = normalize_answer(await ask(game, prompt))
+
         if choice == "hint":
-            provide_hint()
-            continue
-            
-        elif choice == "1":
-            type_text("Dr. Crook breaks into an approving smile!", color=Color.GREEN)
-            type_text("'Excellent diagnosis, doctor! The patient meets the diagnostic criteria for classic Kawasaki Disease.'", color=Color.YELLOW)
-            type_text("'5+ days of fever plus 4 of the 5 classic criteria: rash, conjunctivitis, oral changes, extremity changes, and cervical lymphadenopathy.'", color=Color.YELLOW)
-            type_text("'We need to start IVIG and high-dose aspirin ASAP to prevent coronary artery aneurysms.'", color=Color.YELLOW)
-            
-            # Add diagnosis to our findings
-            player["findings"].append("Final diagnosis: Kawasaki Disease")
-            player["findings"].append("Treatment plan: IVIG and high-dose aspirin")
-            
-            player["correct_choices"] += 2
-            player["reputation"] += 15
-            
-            # Internal thought
-            type_text("(Your brain: 'I... I did it! I actually diagnosed something correctly!')", color=Color.PURPLE)
-            
-            scene_transition()
-            end_game(win=True)
-            break
-            
-        elif choice == "2":
-            type_text("Dr. Crook's face falls. 'Close, but Scarlet Fever doesn't explain all findings.'", color=Color.RED)
-            type_text("'The conjunctival injection, extremity changes, and persistent fever despite appropriate antibiotics point elsewhere.'", color=Color.YELLOW)
-            player["reputation"] -= 5
-            
-            # Internal thought
-            type_text("(Your brain: 'So close yet so far... what am I missing?')", color=Color.PURPLE)
-            
-            continue
-            
-        elif choice == "3":
-            type_text("Dr. Crook shakes his head. 'Interesting thought, but not quite right.'", color=Color.RED)
-            type_text("'No arthritis present, and the mucosal changes and lymphadenopathy suggest something else.'", color=Color.YELLOW)
-            
-            # Internal thought
-            type_text("(Your brain: 'I swear I read about this somewhere... was it in that review article?')", color=Color.PURPLE)
-            
+            await provide_hint(game)
             continue
-            
-        elif choice == "4":
-            type_text("Dr. Crook sighs deeply. 'In pediatrics, sometimes we need to act before all data is in.'", color=Color.RED)
-            type_text("'This child has a time-sensitive condition with risk of serious complications.'", color=Color.YELLOW)
-            player["anxiety"] += 10
-            player["reputation"] -= 5
-            
-            # Internal thought
-            type_text("(Your brain: 'Analysis paralysis strikes again! Make a decision already!')", color=Color.PURPLE)
-            
-            continue
-            
-        else:
-            type_text("'Focus, doctor. This child needs a diagnosis now.'", color=Color.RED)
 
-def end_game(win=False):
+        index = scene.choices.get(choice)
+        if index is not None:
+            return index
+        lines, diagnosis = scene.invalid, None
+        if scene.free_text and choice:
+            index, diagnosis = match_diagnosis(game, scene, choice)
+            if index is not None:
+                return index
+            if diagnosis and scene.unlisted:
+                lines = scene.unlisted  # A real diagnosis, just not one of these
+        await show_lines(game, lines, diagnosis=diagnosis)
+        if scene.repeat_menu:
+            await show_menu(game, scene)
+
+@hooked("decision")
+async def run_scene(game, node):
+    """Plays one decision point; returns the next node (or None when the game ends)"""
+    scene = game.case.scenes[node]
+    print_stats(game)
+    if scene.free_text:
+        diagnosis_index()  # Read it now, so the student's first diagnosis doesn't wait for it
+
+    if scene.summary:
+        await summarize_findings(game, scene.summary)
+    await show_lines(game, scene.lines)
+    if game.charted != node:
+        add_findings(game, scene.findings)
+        game.charted = node  # A game resumed mid-scene already has them
+
+    await show_menu(game, scene)
+
+    while True:
+        index = await choose(game, scene)
+        option = scene.options[index]
+        await show_lines(game, option.lines)
+        apply_option(game, option)
+        if game.log:
+            game.log.choice(node, index + 1, option)
+        if option.next >= 0:
+            game.node = option.next  # Whatever happens next, the answer counts
+        if game.save:
+            game.save.checkpoint(game)  # Penalties too, so quitting can't undo them
+        if option.next < 0:
+            continue  # Wrong answer, try again!
+
+        await scene_transition(game)
+        return option.next
+
+@hooked("decision")
+async def end_game(game, ending):
     """Game ending based on performance"""
-    print_divider()
+    case = game.case
+    print_divider(game)
     
     # Calculate final score
-    score = player["correct_choices"] * 10 + player["reputation"] - player["anxiety"]
+    score = final_score(game.player)
     
-    if win:
-        type_text("CONGRATULATIONS! You correctly diagnosed Kawasaki Disease!", color=Color.GREEN)
-        type_text("Dr. Crook nods approvingly. 'Well done. I'll arrange for IVIG infusion right away.'", color=Color.YELLOW)
-        type_text("'Time is of the essence with KD. Need to prevent those coronary artery aneurysms.'", color=Color.YELLOW)
-        
-        if score > 100:
-            type_text("'You know, you might be cut out for pediatrics after all.'", color=Color.YELLOW)
-            type_text("You've impressed an attending on rotations - a rare achievement indeed!", color=Color.GREEN)
-            # Internal thought
-            type_text("(Your brain: 'Is this what validation feels like? I should frame this moment.')", color=Color.PURPLE)
-        elif score > 50:
-            type_text("'Not bad for a student. There's hope for you yet.'", color=Color.YELLOW)
-            type_text("Dr. Crook gives you a genuine smile and a nod of respect.", color=Color.GREEN)
-            # Internal thought
-            type_text("(Your brain: 'I'm going to ride this high for at least a week.')", color=Color.PURPLE)
-        else:
-            type_text("'You got there eventually, though it was touch and go for a while.'", color=Color.YELLOW)
-            type_text("'We'll work on your diagnostic approach. That's why you're here to learn.'", color=Color.YELLOW)
-            # Internal thought
-            type_text("(Your brain: 'The important thing is I didn't kill anyone. Progress!')", color=Color.PURPLE)
-    else:
-        type_text("The patient was transferred to the PICU after developing coronary complications.", color=Color.RED)
-        type_text("Dr. Crook looks disappointed. 'We'll discuss this further at your evaluation.'", color=Color.YELLOW)
-        # Internal thought
-        type_text("(Your brain: 'Maybe the hospital cafeteria is hiring...')", color=Color.PURPLE)
+    await show_lines(game, ending.lines)
+    if ending.tiers:
+        await show_lines(game, ending.tiers[min(score_tier(score), len(ending.tiers) - 1)])
     
     # Show a summary of what was discovered throughout the game
-    print("\n📋 CASE SUMMARY:")
-    if player["findings"]:
-        for finding in player["findings"]:
-            print(f"• {finding}")
+    game.screen.print("\n📋 CASE SUMMARY:")
+    if game.player["findings"]:
+        for finding in game.player["findings"]:
+            game.screen.print(f"• {finding}")
     
-    print_divider()
-    print(Color.CYAN + f"🏆 FINAL SCORE: {score}" + Color.RESET)
-    print(Color.CYAN + f"Correct Decisions: {player['correct_choices']}" + Color.RESET)
-    print(Color.CYAN + f"Reputation with Dr. Crook: {player['reputation']}" + Color.RESET)
-    print(Color.CYAN + f"Anxiety Level: {player['anxiety']}" + Color.RESET)
-    print(Color.CYAN + f"Clinical Pearls Used: {hints_used}/{max_hints}" + Color.RESET)
-    print_divider()
+    print_divider(game)
+    game.screen.print(Color.CYAN + f"🏆 FINAL SCORE: {score}" + Color.RESET)
+    game.screen.print(Color.CYAN + f"Correct Decisions: {game.player['correct_choices']}" + Color.RESET)
+    game.screen.print(Color.CYAN + f"Reputation with {case.attending}: {game.player['reputation']}" + Color.RESET)
+    game.screen.print(Color.CYAN + f"Anxiety Level: {game.player['anxiety']}" + Color.RESET)
+    game.screen.print(Color.CYAN + f"Clinical Pearls Used: {game.hints_used}/{max_hints}" + Color.RESET)
+    print_divider(game)
     
     # Display all available clinical pearls at the end for educational purposes
-    if win:
-        print(Color.GREEN + "\n📚 CLINICAL PEARLS FOR KAWASAKI DISEASE:" + Color.RESET)
-        for i, pearl in enumerate(hints_dict["kawasaki"], 1):
-            print(f"{i}. {pearl}")
-        print()
+    if ending.win:
+        game.screen.print(Color.GREEN + f"\n📚 CLINICAL PEARLS FOR {case.diagnosis.upper()}:" + Color.RESET)
+        for i, pearl in enumerate(case.hints, 1):
+            game.screen.print(f"{i}. {pearl}")
+        game.screen.print()
     
-    type_text("Thank you for playing ddxCROOK: KAWASAKI EDITION!", color=Color.GREEN)
-    type_text("Remember, in both pediatrics and coding: careful observation makes all the difference!", color=Color.GREEN)
+    await show_lines(game, case.outro)
 
-def start_game():
-    """Game initialization and introduction"""
-    clear_screen()
+@hooked("decision")
+async def start_game(game):
+    """Game initialization and introduction (returns the first scene of the case)"""
+    case = game.case
+    clear_screen(game)
     
-    # Display game title ASCII art with color
-    print(Color.CYAN + """
-     █████     █████               █████████  ███████████      ███████       ███████    █████   ████
-    ░░███     ░░███               ███░░░░░███░░███░░░░░███   ███░░░░░███   ███░░░░░███ ░░███   ███░ 
-  ███████   ███████  █████ █████ ███     ░░░  ░███    ░███  ███     ░░███ ███     ░░███ ░███  ███   
- ███░░███  ███░░███ ░░███ ░░███ ░███          ░██████████  ░███      ░███░███      ░███ ░███████    
-░███ ░███ ░███ ░███  ░░░█████░  ░███          ░███░░░░░███ ░███      ░███░███      ░███ ░███░░███   
-░███ ░███ ░███ ░███   ███░░░███ ░░███     ███ ░███    ░███ ░░███     ███ ░░███     ███  ░███ ░░███  
-░░████████░░████████ █████ █████ ░░█████████  █████   █████ ░░░███████░   ░░░███████░   █████ ░░████
- ░░░░░░░░  ░░░░░░░░ ░░░░░ ░░░░░   ░░░░░░░░░  ░░░░░   ░░░░░    ░░░░░░░       ░░░░░░░    ░░░░░   ░░░░ 
-    """ + Color.RESET)
+    # Every case brings its own title art (loaded with the case, not before)
+    if case.art:
+        game.screen.write_frame(frame(game.screen.profile, ("art", case.name, case.hash), _art(case)))
     
-    print_divider()
-    type_text("🏥 Welcome to ddxCROOK: A Pediatric Diagnosis Adventure 🏥", color=Color.GREEN)
-    type_text("Where every child is a diagnostic puzzle, and every attending is a final boss...", color=Color.CYAN)
-    type_text("(and your impostor syndrome is your true nemesis)", color=Color.PURPLE)
-    type_text("NEW FEATURE: Type 'hint' at any decision point to get a clinical pearl! (3 available per game)", color=Color.GREEN + Color.BOLD)
+    print_divider(game)
+    await show_lines(game, case.welcome)
+    await type_text(game, f"NEW FEATURE: Type 'hint' at any decision point to get a clinical pearl! ({max_hints} available per game)", color=Color.GREEN + Color.BOLD)
         
-    player["name"] = input("\nEnter your name, brave medical student: ")
+    game.player["name"] = await ask(game, "\nEnter your name, brave medical student: ")
     
-    type_text(f"\n[7:15 AM - Pediatric Ward]", color=Color.BLUE)
-    type_text("Morning rounds are about to start.")
-    type_text(f"You, {player['name']}, are the med student nervously reviewing your patient list when...")
-    type_text(".....")
-
-    type_text("👨‍⚕️ Dr. Crook appears suddenly behind you with uncanny stealth!", color=Color.YELLOW)
-    type_text("'Ah, perfect timing. Got an interesting admission overnight.'", color=Color.YELLOW)
-    type_text("'5-year-old with quite the constellation of symptoms. Fascinating vitals too.'", color=Color.YELLOW)
+    await show_lines(game, case.intro)
     
-    # Internal thought
-    type_text("(You: 'Why do attendings always appear out of nowhere? Do they teach teleportation in med school?')", color=Color.PURPLE)
-    
-    scene_transition()
-    
-    first_decision()
+    await scene_transition(game)
+    return case.start
+
+async def play(game):
+    """Runs the game's case scene by scene until it reaches an ending"""
+    case = game.case
+    game.screen.begin_scene("start_game")
+    if game.probe:
+        game.probe.scene("start_game")
+    if game.node is None:
+        node = await start_game(game)
+    else:
+        node = game.node  # Resumed from a save file (see ddxcrook_save.py)
+        await type_text(game, f"💾 Welcome back, Dr. {game.player['name']}! {game.case.attending} is still waiting...", color=Color.CYAN)
+    while node is not None:
+        game.node = node
+        game.screen.begin_scene(case.nodes[node])
+        if game.probe:
+            game.probe.scene(case.nodes[node])
+        if game.log:
+            game.log.scene(node)
+        if node < len(case.scenes):
+            if game.save:
+                game.save.checkpoint(game)
+            node = await run_scene(game, node)
+        else:
+            if game.log:
+                game.log.end(node)
+            await end_game(game, case.endings[node - len(case.scenes)])
+            if game.save:
+                game.save.finish()
+            node = None
+
+def run_sync(coro):
+    """Runs a game coroutine to the end without any event loop
+
+    The terminal game's sleep and readline block instead of awaiting anything,
+    so the whole playthrough finishes on the very first step.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as done:
+        return done.value
+    coro.close()
+    raise RuntimeError("run_sync() only works with blocking I/O; use asyncio.run() for async games")
+# ======= END SCENE ENGINE =======
 
 # Start our adventure! 🎮✨
 if __name__ == "__main__":
+    # The helper modules below do `import ddxcrook`: hand them this module, not a
+    # second copy with its own render mode, hooks and Note classes
+    sys.modules.setdefault("ddxcrook", sys.modules[__name__])
+    parser = argparse.ArgumentParser(description="ddxCROOK: A Pediatric Diagnosis Adventure")
+    parser.add_argument("--instant", action="store_true",
+                        help="skip all typewriter delays and 'Press Enter' pauses (for automated runs)")
+    parser.add_argument("--case", default="kawasaki",
+                        help="which case from the cases/ folder to play (default: kawasaki)")
+    parser.add_argument("--list-cases", action="store_true", help="show which cases you can play and quit")
+    parser.add_argument("--profile", default="auto", choices=("auto",) + tuple(PROFILES),
+                        help="output profile: colors and emoji (full), no colors (mono), plain ASCII "
+                             "(plain), or whatever this terminal supports (auto, the default)")
+    parser.add_argument("--log", metavar="DIR",
+                        help="record every decision to a session log in DIR (see ddxcrook_log.py)")
+    parser.add_argument("--timings", action="store_true",
+                        help="show where the time went, scene by scene, when the game ends (see ddxcrook_timing.py)")
+    saving = parser.add_mutually_exclusive_group()
+    saving.add_argument("--save", metavar="FILE", help="checkpoint the game to FILE after every answer")
+    saving.add_argument("--resume", metavar="FILE", help="pick a saved game back up (and keep saving to it)")
+    args = parser.parse_args()
+    if args.list_cases:
+        print("\n".join(list_cases()))
+        sys.exit(0)
+    if args.instant:
+        set_render_mode("instant")
+    enable_ansi()
+    profile = pick_profile(args.profile)
+
+    try:
+        if args.resume:
+            from ddxcrook_save import SaveError, resume
+            try:
+                game = resume(args.resume, profile=profile)
+            except SaveError as e:
+                print(f"Couldn't resume that game: {e}")
+                sys.exit(1)
+        else:
+            game = GameState(load_case(args.case), profile=profile)
+    except CaseError as e:
+        print(f"Couldn't load that case: {e}")
+        sys.exit(1)
+    if args.save:
+        from ddxcrook_save import SaveFile
+        game.save = SaveFile(args.save)
+    if args.log:
+        from ddxcrook_log import EventLog
+        game.log = EventLog.create(args.log, game)
+    if args.timings:
+        from ddxcrook_timing import SceneTimer
+        game.probe = SceneTimer()
+    game.screen.keys = Keyboard.open()
+
     try:
-        start_game()
+        run_sync(play(game))
     except KeyboardInterrupt:
-        print("\n\nGame interrupted. Thanks for playing!")
+        game.screen.print("\n\nGame interrupted. Thanks for playing!")
+        if game.save and game.save.saved:
+            game.screen.print(f"💾 Pick up where you left off with: python ddxcrook.py --resume {game.save.path}")
     except Exception as e:
-        print(f"\n\nAn error occurred: {e}")
-        print("Sorry about that! Please report this bug.")
+        game.screen.print(f"\n\nAn error occurred: {e}")
+        game.screen.print("Sorry about that! Please report this bug.")
+    finally:
+        if game.screen.keys:
+            game.screen.keys.stop()
+        game.panel.release()
+        game.screen.flush()
+        if game.log:
+            game.log.close()
+        if game.probe:
+            print(game.probe.summary(), file=sys.stderr)
+        # Set DDXCROOK_RENDER_STATS=1 to see how many writes each scene cost
+        if os.environ.get("DDXCROOK_RENDER_STATS"):
+            print(game.screen.report(), file=sys.stderr)
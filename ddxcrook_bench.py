@@ -0,0 +1,237 @@
+"""ddxCROOK benchmarks: are rounds getting faster or slower? ⏱️
+
+    python ddxcrook_bench.py                     # run everything, add it to the history
+    python ddxcrook_bench.py --case pheochromocytoma --rounds 500
+    python ddxcrook_bench.py --no-save           # just have a look
+    python ddxcrook_bench.py --strict            # exit 1 if anything got worse
+
+Measures:
+
+- type_text throughput (characters per second and writes per 1,000 characters)
+  in instant and typewriter mode. The typewriter's sleeps are skipped, so this
+  is what the framing itself costs, not the dramatic pauses.
+- print_stats cost as the Diagnosis Clues pile up, both the full block and
+  the one-line update
+- how long each scene takes to play, from the first decision to end_game
+- full scripted playthroughs per second, muted (like the simulator) and
+  rendered to a terminal that throws everything away
+
+The scripted student always takes the best path through the case (worked
+out by ddxcrook_paths.py), so every run plays exactly the same game.
+
+Each run is added to a JSON history file (bench_history.json unless you say
+otherwise) and compared with the last run of the same case, so a change that
+makes rounds 30% slower shows up before a whole cohort logs in.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+import ddxcrook
+import ddxcrook_paths
+from ddxcrook_sim import ScriptedPolicy
+
+# About as long as a line of Dr. Crook's dialogue
+SAMPLE = ("Dr. Crook peers over his glasses. 'Five days of fever, red eyes, cracked lips and a "
+          "rash that won't quit. Tell me, doctor, what are we worried about, and what do we order "
+          "before lunch?'")
+CLUE_COUNTS = (0, 5, 10, 20, 50)  # Diagnosis Clues on the panel for the print_stats runs
+TOLERANCE = 0.2                     # How much worse a number can get before we call it a regression
+
+class Sink:
+    """A terminal that throws everything away (the Renderer still counts writes and bytes)"""
+    encoding = "utf-8"
+
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+async def no_sleep(seconds):
+    pass
+
+def play_scripted(case, answers, muted=False, marks=None):
+    """One full game with the scripted student; `marks` collects (scene, time) as scenes start"""
+    policy = ScriptedPolicy(None, answers)
+
+    async def readline():
+        return policy(game)
+
+    game = ddxcrook.GameState(case, stream=Sink(), readline=readline, sleep=no_sleep, muted=muted, seed=0)
+    if marks is not None:
+        begin_scene = game.screen.begin_scene
+
+        def timed_begin_scene(scene):
+            marks.append((scene, time.perf_counter()))
+            begin_scene(scene)
+
+        game.screen.begin_scene = timed_begin_scene
+    ddxcrook.run_sync(ddxcrook.play(game))
+    game.screen.flush()
+    if marks is not None:
+        marks.append((None, time.perf_counter()))
+    return game
+
+# ======= BENCHMARKS =======
+def bench_type_text(case, rounds):
+    """Characters per second and writes per 1,000 characters, per render mode"""
+    results = {}
+    for mode in ddxcrook.RENDER_MODES:
+        ddxcrook.set_render_mode(mode)
+        game = ddxcrook.GameState(case, stream=Sink(), sleep=no_sleep)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            ddxcrook.run_sync(ddxcrook.type_text(game, SAMPLE))
+        elapsed = time.perf_counter() - start
+        chars = rounds * len(SAMPLE)
+        results[f"type_text.{mode}.chars_per_sec"] = chars / elapsed
+        results[f"type_text.{mode}.writes_per_1k_chars"] = 1000 * game.screen.writes / chars
+    return results
+
+def bench_print_stats(case, rounds):
+    """Microseconds and bytes per print_stats call, for a growing pile of clues"""
+    ddxcrook.set_render_mode("instant")
+    results = {}
+    for clues in CLUE_COUNTS:
+        game = ddxcrook.GameState(case, stream=Sink())
+        game.player["name"] = "Bench"
+        game.player["diagnosis_hints"] = [ddxcrook.Hint("diagnosis", f"Clue number {number}")
+                                          for number in range(clues)]
+        for kind in ("full", "update"):
+            ddxcrook.print_stats(game)  # So "update" has something to compare with
+            game.screen.flush()
+            game.screen.writes = game.screen.bytes = 0
+            start = time.perf_counter()
+            for _ in range(rounds):
+                if kind == "full":
+                    game.panel.fields = None  # As if the screen had just been cleared
+                ddxcrook.print_stats(game)
+                game.screen.flush()
+            elapsed = time.perf_counter() - start
+            results[f"print_stats.{kind}.{clues}_clues.us"] = 1e6 * elapsed / rounds
+            results[f"print_stats.{kind}.{clues}_clues.bytes"] = game.screen.bytes / rounds
+    return results
+
+def bench_scenes(case, answers, rounds):
+    """Average milliseconds spent in each scene (and the intro and ending)"""
+    ddxcrook.set_render_mode("instant")
+    totals, visits = {}, {}
+    for _ in range(rounds):
+        marks = []
+        play_scripted(case, answers, marks=marks)
+        for (scene, started), (_, finished) in zip(marks, marks[1:]):
+            totals[scene] = totals.get(scene, 0) + finished - started
+            visits[scene] = visits.get(scene, 0) + 1
+    return {f"scene.{scene}.ms": 1000 * totals[scene] / visits[scene] for scene in totals}
+
+def bench_playthroughs(case, answers, rounds):
+    """Whole games per second, muted and rendered"""
+    ddxcrook.set_render_mode("instant")
+    results = {}
+    for kind, muted in (("muted", True), ("rendered", False)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            play_scripted(case, answers, muted=muted)
+        results[f"playthrough.{kind}.games_per_sec"] = rounds / (time.perf_counter() - start)
+    return results
+
+def run_all(case, rounds):
+    """Every benchmark, as one flat {metric: value} dict"""
+    _, path = ddxcrook_paths.extreme(case, max)
+    answers = [str(number) for number in path or ()]
+    results = {}
+    results.update(bench_type_text(case, rounds * 10))
+    results.update(bench_print_stats(case, rounds * 10))
+    results.update(bench_scenes(case, answers, rounds))
+    results.update(bench_playthroughs(case, answers, rounds))
+    return results
+# ======= END BENCHMARKS =======
+
+# ======= HISTORY =======
+def higher_is_better(metric):
+    return metric.endswith("_per_sec")
+
+def version():
+    """The git commit we're benchmarking (if there is one)"""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+def save_history(path, history):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+        f.write("\n")
+
+def compare(previous, results, tolerance=TOLERANCE):
+    """Lines for the results table, and the metrics that got worse by more than `tolerance`"""
+    lines = [f"{'metric':<44}{'now':>14}{'before':>14}{'change':>9}"]
+    regressions = []
+    for metric, value in results.items():
+        before = previous.get(metric)
+        line = f"{metric:<44}{value:>14,.2f}"
+        if before:
+            change = (value - before) / before
+            worse = -change if higher_is_better(metric) else change
+            line += f"{before:>14,.2f}{change:>+9.1%}"
+            if worse > tolerance:
+                line += "  ⚠️"
+                regressions.append(metric)
+        lines.append(line)
+    return lines, regressions
+# ======= END HISTORY =======
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ddxCROOK's renderer and scene engine")
+    parser.add_argument("--case", default="kawasaki", help="case to benchmark (default: kawasaki)")
+    parser.add_argument("--rounds", type=int, default=200, help="how many games per benchmark (default: 200)")
+    parser.add_argument("--history", default="bench_history.json", help="JSON file of past runs")
+    parser.add_argument("--no-save", action="store_true", help="don't add this run to the history")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"how much worse counts as a regression (default: {TOLERANCE}, i.e. 20%%)")
+    parser.add_argument("--strict", action="store_true", help="exit 1 if anything regressed")
+    args = parser.parse_args()
+
+    try:
+        case = ddxcrook.load_case(args.case)
+        history = load_history(args.history)
+    except (ddxcrook.CaseError, OSError, ValueError) as e:
+        sys.exit(f"Couldn't start the benchmarks: {e}")
+
+    print(f"⏱️  Benchmarking {case.name} ({args.rounds} rounds)...")
+    results = run_all(case, args.rounds)
+    previous = next((run["results"] for run in reversed(history) if run["case"] == case.name), {})
+    lines, regressions = compare(previous, results, args.tolerance)
+    print("\n".join(lines))
+
+    if not args.no_save:
+        history.append({
+            "when": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "version": version(),
+            "python": platform.python_version(),
+            "case": case.name,
+            "rounds": args.rounds,
+            "results": results,
+        })
+        save_history(args.history, history)
+        print(f"\n📈 Added to {args.history} ({len(history)} runs so far)")
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} metrics got more than {args.tolerance:.0%} worse")
+        if args.strict:
+            sys.exit(1)
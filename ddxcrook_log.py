@@ -0,0 +1,261 @@
+"""ddxCROOK session logs: every decision, written down for good 📼
+
+Each playthrough gets its own append-only binary log. After a short header
+(which case, which version of it, who played, and their chart as the log
+starts, which matters for games resumed from a save file), every event is one
+fixed-width record:
+
+    kind  node  item  flags  anxiety  reputation  correct  time
+     B     H     H     B       h          h          h      I      (16 bytes)
+
+- SCENE: the student walked into `node`
+- CHOICE: they picked option `item` (flags bit 0 = wrong answer, stayed put),
+  and the stat columns hold what it changed
+- HINT: they asked for pearl number `item` (65535 = the generic fallback)
+- END: they reached ending `node`
+
+Turn it on with `python ddxcrook.py --log logs/` (or `--log-dir` on the
+server), then:
+
+    python ddxcrook_log.py replay logs/<session>.ddxlog --scene fourth_decision
+    python ddxcrook_log.py audit logs/
+
+Replay rebuilds the student's exact chart at any scene without playing a
+single line of dialogue; audit reads a whole semester through mmap in seconds.
+Version 1 logs (one-byte node and item, so at most 255 of each) still read fine.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import argparse
+import itertools
+from collections import Counter, defaultdict
+
+import ddxcrook
+
+MAGIC = b"DDXLOG"
+LOG_FORMAT = 2
+HEADER = struct.Struct("<6sBI")       # magic, format, length of the JSON that follows
+RECORD = struct.Struct("<BHHBhhhI")   # see the table above
+RECORDS = {1: struct.Struct("<BBBBhhhI"), LOG_FORMAT: RECORD}  # Every format we can still read
+
+SCENE, CHOICE, HINT, END = 1, 2, 3, 4
+WRONG = 1                             # CHOICE flag: the option didn't move the student on
+NO_ITEM = 0xFFFF                      # HINT item for the "focus on the pattern" fallback
+OLD_NO_ITEM = 255                     # ...and what version 1 logs used for it
+
+class LogError(Exception):
+    """A log file we can't make sense of"""
+
+# ======= WRITING =======
+_sessions = itertools.count(1)
+
+class EventLog:
+    """Appends one session's events to its own log file
+
+    Nothing touches the disk until the first scene starts, so the header can
+    include the student's name (and quitting at the name prompt leaves no file).
+    """
+
+    def __init__(self, path, game):
+        self.path = path
+        self.game = game
+        self.file = None
+        self.started = time.monotonic()
+
+    @classmethod
+    def create(cls, directory, game):
+        """A fresh log for `game` in `directory`, with a name no other session will pick"""
+        os.makedirs(directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_sessions)}.ddxlog"
+        return cls(os.path.join(directory, name), game)
+
+    def _open(self):
+        case = self.game.case
+        player = self.game.player
+        header = json.dumps({
+            "case": case.name,
+            "hash": case.hash,
+            "nodes": case.nodes,
+            "name": player["name"],
+            "started": time.time(),
+            # The chart so far: a fresh one, unless the game was resumed mid-case
+            "start": dict(
+                {stat: player[stat] for stat in ddxcrook.STATS},
+                findings=[[note.tag, note.text] for note in player["findings"]],
+                diagnosis_hints=[[note.tag, note.text] for note in player["diagnosis_hints"]],
+                hints_received=list(player["hints_received"]),
+                hints_used=self.game.hints_used,
+            ),
+        }).encode("utf-8")
+        self.file = open(self.path, "ab")
+        self.file.write(HEADER.pack(MAGIC, LOG_FORMAT, len(header)) + header)
+
+    def _write(self, kind, node, item=0, flags=0, effects=(0, 0, 0)):
+        if self.file is None:
+            self._open()
+        elapsed = int((time.monotonic() - self.started) * 1000)
+        self.file.write(RECORD.pack(kind, node, item, flags, *effects, elapsed))
+        self.file.flush()  # A crash (or a closed laptop) loses at most the event in flight
+
+    def scene(self, node):
+        self._write(SCENE, node)
+
+    def choice(self, node, number, option):
+        self._write(CHOICE, node, number, WRONG if option.next < 0 else 0, option.effects)
+
+    def hint(self, node, index):
+        self._write(HINT, node, NO_ITEM if index is None else index)
+
+    def end(self, node):
+        self._write(END, node)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+# ======= END WRITING =======
+
+# ======= READING =======
+def read_log(path):
+    """Maps a log into memory; returns (header, records) where records unpacks lazily
+
+    A record cut off by a crash at the very end is ignored.
+    """
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise LogError(f"{path}: empty file") from None
+    if len(data) < HEADER.size:
+        raise LogError(f"{path}: too short to be a session log")
+    magic, version, length = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in RECORDS:
+        raise LogError(f"{path}: not a ddxCROOK log we can read (versions {', '.join(map(str, RECORDS))})")
+    start = HEADER.size + length
+    header = json.loads(bytes(data[HEADER.size:start]).decode("utf-8"))
+    record = RECORDS[version]
+    end = start + (len(data) - start) // record.size * record.size
+    records = record.iter_unpack(memoryview(data)[start:end])
+    if version == 1:
+        records = ((kind, node, NO_ITEM if kind == HINT and item == OLD_NO_ITEM else item, *rest)
+                   for kind, node, item, *rest in records)
+    return header, records
+
+def replay(path, scene=None):
+    """Rebuilds the student's chart, as it was when they walked into `scene`
+    (or at the end of the log), straight from the case file. Returns (player, hints_used).
+    """
+    header, records = read_log(path)
+    case = ddxcrook.load_case(header["case"])
+    if case.hash != header["hash"]:
+        raise LogError(f"{path}: cases/{case.name}.json has changed since this session was played")
+    if scene is not None and scene not in case.nodes:
+        raise LogError(f"{case.name} has no scene called {scene!r}")
+
+    player = ddxcrook.new_player(header["name"])
+    hints_used = 0
+    start = header.get("start")  # Logs from before resumed games were logged properly don't have it
+    if start:
+        for stat in ddxcrook.STATS:
+            player[stat] = start[stat]
+        player["findings"] = [ddxcrook.Finding(*note) for note in start["findings"]]
+        player["diagnosis_hints"] = [ddxcrook.Hint(*note) for note in start["diagnosis_hints"]]
+        player["hints_received"] = list(start["hints_received"])
+        hints_used = start["hints_used"]
+    for kind, node, item, flags, *effects, elapsed in records:
+        if kind == SCENE:
+            if case.nodes[node] == scene:
+                return player, hints_used
+            if node < len(case.scenes):
+                player["findings"].extend(case.scenes[node].findings)
+        elif kind == CHOICE:
+            option = case.scenes[node].options[item - 1]
+            for stat, delta in zip(ddxcrook.STATS, effects):
+                player[stat] += delta
+            player["findings"].extend(option.findings)
+            player["diagnosis_hints"].extend(option.clues)
+        elif kind == HINT:
+            hints_used += 1
+            if item != NO_ITEM and case.hints[item] not in player["hints_received"]:
+                player["hints_received"].append(case.hints[item])
+    if scene is not None:
+        raise LogError(f"{path}: this student never reached {scene!r}")
+    return player, hints_used
+
+def log_files(paths):
+    """Every .ddxlog under the given files and folders"""
+    for path in paths:
+        if os.path.isdir(path):
+            for folder, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(".ddxlog"):
+                        yield os.path.join(folder, name)
+        else:
+            yield path
+
+def audit(paths):
+    """Stats for a pile of logs, read straight from the records (no case files needed)"""
+    sessions = Counter()
+    scores = defaultdict(list)
+    wrong = defaultdict(Counter)
+    hints = defaultdict(Counter)
+    minutes = defaultdict(float)
+    fresh = [ddxcrook.new_player()[stat] for stat in ddxcrook.STATS]
+    for path in log_files(paths):
+        try:
+            header, records = read_log(path)
+        except (OSError, LogError, ValueError) as e:
+            print(f"⚠️  skipping {e}", file=sys.stderr)
+            continue
+        case, nodes = header["case"], header["nodes"]
+        sessions[case] += 1
+        start = header.get("start")
+        stats = [start[stat] for stat in ddxcrook.STATS] if start else fresh
+        elapsed = 0
+        for kind, node, item, flags, *effects, elapsed in records:
+            if kind == CHOICE:
+                stats = [total + delta for total, delta in zip(stats, effects)]
+                if flags & WRONG:
+                    wrong[case][nodes[node]] += 1
+            elif kind == HINT:
+                hints[case][nodes[node]] += 1
+            elif kind == END:
+                scores[case].append(ddxcrook.final_score(dict(zip(ddxcrook.STATS, stats))))
+        minutes[case] += elapsed / 60000
+
+    lines = []
+    for case in sorted(sessions):
+        finished = scores[case]
+        lines.append(f"📼 {case}: {sessions[case]:,} sessions, {len(finished):,} finished, "
+                     f"{minutes[case] / sessions[case]:.1f} min on average")
+        if finished:
+            lines.append(f"  final score: mean {sum(finished) / len(finished):.1f}, "
+                         f"min {min(finished)}, max {max(finished)}")
+        for scene in sorted(set(wrong[case]) | set(hints[case]), key=lambda scene: -wrong[case][scene]):
+            lines.append(f"  {scene}: {wrong[case][scene]:,} wrong answers, {hints[case][scene]:,} hints")
+        lines.append("")
+    return "\n".join(lines) or "No logs found."
+# ======= END READING =======
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay and audit ddxCROOK session logs")
+    commands = parser.add_subparsers(dest="command", required=True)
+    replaying = commands.add_parser("replay", help="rebuild one student's chart")
+    replaying.add_argument("log", help="a .ddxlog file")
+    replaying.add_argument("--scene", help="stop as the student walks into this scene")
+    auditing = commands.add_parser("audit", help="summarize lots of sessions")
+    auditing.add_argument("paths", nargs="+", help=".ddxlog files or folders full of them")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "replay":
+            player, hints_used = replay(args.log, args.scene)
+            print(json.dumps(dict(player, hints_used=hints_used), indent=2, ensure_ascii=False, default=str))
+        else:
+            print(audit(args.paths))
+    except (OSError, LogError, ddxcrook.CaseError) as e:
+        sys.exit(f"Couldn't read that log: {e}")
@@ -0,0 +1,275 @@
+"""ddxCROOK path checker: every way through a case, without typing a single line 🗺️
+
+Works straight off the compiled case graph (no play(), no type_text), so even
+"what if they answer wrong forever?" takes seconds, not a lifetime on rounds:
+
+    python ddxcrook_paths.py                    # check every case in cases/
+    python ddxcrook_paths.py kawasaki --turns 30
+
+For each case it reports:
+
+- the best and worst final score over ALL playthroughs (or "unbounded" when a
+  loop of answers can keep pushing the score up or down forever)
+- the best and worst score among games that finish within --turns prompts,
+  and how many (scene, stats, hints_used) states those games can reach
+- the same for every ending, plus which score tiers each ending can give
+- how long the best playthrough keeps a student reading (the typewriter and
+  the dramatic pauses add up), played on a virtual clock so it takes no time
+
+...and complains (exit code 1) about scenes nobody can reach, scenes nobody can
+leave, and loops that let a student farm points. Endings nobody can get are
+pointed out but allowed (Kawasaki's "lose" ending is one). Run it before
+shipping a case!
+"""
+import io
+import sys
+import argparse
+
+import ddxcrook
+
+UNBOUNDED = float("inf")
+
+def moves(case):
+    """Every option as (effects, score change, next node), scene by scene
+
+    final_score() is a straight sum of the stats, so each option always changes
+    the score by the same amount no matter what happened before it.
+    """
+    start = dict(ddxcrook.new_player(), **{stat: 0 for stat in ddxcrook.STATS})
+    table = []
+    for node, scene in enumerate(case.scenes):
+        row = []
+        for option in scene.options:
+            changed = dict(start, **dict(zip(ddxcrook.STATS, option.effects)))
+            gain = ddxcrook.final_score(changed) - ddxcrook.final_score(start)
+            row.append((option.effects, gain, node if option.next < 0 else option.next))
+        table.append(tuple(row))
+    return tuple(table)
+
+def reachable(case):
+    """Nodes (scenes and endings) a student can actually get to"""
+    table = moves(case)
+    seen = {case.start}
+    todo = [case.start]
+    while todo:
+        node = todo.pop()
+        if node >= len(case.scenes):
+            continue
+        for _, _, target in table[node]:
+            if target not in seen:
+                seen.add(target)
+                todo.append(target)
+    return seen
+
+def gains(case, pick, answers, endings=None):
+    """The DP table: gains(...)[k][node] is the best (pick=max) or worst (pick=min)
+    score change from `node` to one of `endings` in at most k answers
+
+    None means "can't get there in time". Each row only looks at the row before
+    it, so this is just len(scenes) * answers * options steps.
+    """
+    table = moves(case)
+    first = len(case.scenes)
+    endings = range(first, len(case.nodes)) if endings is None else endings
+    row = [None] * first + [0 if node in endings else None for node in range(first, len(case.nodes))]
+    rows = [row]
+    for _ in range(answers):
+        previous = row
+        row = list(previous)
+        for node in range(first):
+            options = [gain + previous[target] for _, gain, target in table[node]
+                       if previous[target] is not None]
+            if options:
+                row[node] = pick(options) if previous[node] is None else pick(options + [previous[node]])
+        rows.append(row)
+    return rows
+
+def extreme(case, pick, endings=None):
+    """Best or worst final score over every possible playthrough
+
+    Returns (score, answers) with answers = the option numbers that get there,
+    or (+/-UNBOUNDED, None) if a loop keeps improving it forever, or (None, None)
+    if those endings can't be reached at all.
+    """
+    # Without a runaway loop the extreme never needs more answers than there
+    # are scenes (Bellman-Ford): if one extra answer still changes anything,
+    # some loop is worth going around again and again.
+    scenes = len(case.scenes)
+    rows = gains(case, pick, scenes + 1, endings)
+    if rows[scenes + 1][case.start] is None:
+        return None, None
+    live = reachable(case)
+    if any(rows[scenes + 1][node] != rows[scenes][node] for node in live):
+        return (UNBOUNDED if pick is max else -UNBOUNDED), None
+    return ddxcrook.final_score(ddxcrook.new_player()) + rows[scenes][case.start], best_answers(case, rows, scenes)
+
+def best_answers(case, rows, answers):
+    """Walks the DP table back to the option numbers of the winning playthrough"""
+    table = moves(case)
+    node, path = case.start, []
+    while node < len(case.scenes):
+        # Shortest first, so "answer wrong for no reason" never sneaks in
+        steps = next(k for k in range(answers + 1) if rows[k][node] == rows[answers][node])
+        for number, (_, gain, target) in enumerate(table[node], 1):
+            if rows[steps - 1][target] is not None and gain + rows[steps - 1][target] == rows[steps][node]:
+                path.append(number)
+                node, answers = target, steps - 1
+                break
+    return path
+
+def explore(case, turns):
+    """Breadth-first search over every (scene, stats, hints_used) a student can be in
+
+    A turn is one answered prompt: picking an option or asking for a hint.
+    Each state is only expanded the first time we see it, which keeps the
+    "wrong answer forever" branches from exploding. Returns the number of
+    states and the {ending: (worst, best, games)} of games that finished.
+    """
+    table = moves(case)
+    first = len(case.scenes)
+    player = ddxcrook.new_player()
+    start = (case.start, tuple(player[stat] for stat in ddxcrook.STATS), 0)
+    seen = {start}
+    frontier = [start]
+    finished = {}
+    for _ in range(turns):
+        following = []
+        for node, stats, hints in frontier:
+            steps = [(target, tuple(a + b for a, b in zip(stats, effects)), hints)
+                     for effects, _, target in table[node]]
+            if hints < ddxcrook.max_hints:
+                steps.append((node, stats, hints + 1))
+            for state in steps:
+                if state in seen:
+                    continue
+                seen.add(state)
+                if state[0] >= first:
+                    score = ddxcrook.final_score(dict(zip(ddxcrook.STATS, state[1])))
+                    worst, best, games = finished.get(state[0], (score, score, 0))
+                    finished[state[0]] = (min(worst, score), max(best, score), games + 1)
+                else:
+                    following.append(state)
+        frontier = following
+    return len(seen), finished
+
+def reading_time(case, answers, clock=None):
+    """{scene: seconds of forced reading} for one playthrough with these option numbers
+
+    The real play() runs at full typewriter pacing, but on a VirtualClock
+    (pass your own to look at it afterwards), so every pause is actually
+    taken and the whole game still only takes milliseconds.
+    """
+    # Enter at every "[Press Enter to continue...]": after the intro, and after each right answer
+    typed = ["Dr. Paths", ""]
+    node = case.start
+    for number in answers:
+        typed.append(str(number))
+        option = case.scenes[node].options[number - 1]
+        if option.next >= 0:
+            typed.append("")
+            node = option.next
+    typed = iter(typed)
+
+    async def readline():
+        return next(typed)
+
+    clock = clock or ddxcrook.VirtualClock()
+    previous = ddxcrook.render_mode
+    ddxcrook.set_render_mode("typewriter")
+    try:
+        game = ddxcrook.GameState(case, stream=io.StringIO(), readline=readline, sleep=clock.sleep, seed=0)
+        ddxcrook.run_sync(ddxcrook.play(game))
+    finally:
+        ddxcrook.set_render_mode(previous)
+    return game.screen.reading_time()
+
+def tiers_between(worst, best):
+    """Which score tiers (see score_tier) a final score from worst to best can land in"""
+    return range(ddxcrook.score_tier(best), ddxcrook.score_tier(worst) + 1)
+
+def check(case):
+    """Things that would make a case unfair or unplayable (empty list = good to go)"""
+    problems = []
+    live = reachable(case)
+    stuck = gains(case, max, len(case.scenes))[-1]
+    for node, scene in enumerate(case.scenes):
+        name = scene.name
+        if node not in live:
+            problems.append(f"scene {name!r} can never be reached")
+        elif stuck[node] is None:
+            problems.append(f"scene {name!r} never leads to an ending (students get stuck there forever)")
+    if extreme(case, max)[0] == UNBOUNDED:
+        problems.append("some loop of answers raises the score forever (free points!)")
+    return problems
+
+def describe(score):
+    if score is None:
+        return "n/a"
+    if score in (UNBOUNDED, -UNBOUNDED):
+        return "unbounded"
+    return str(score)
+
+def report(case, turns):
+    """Everything we know about one case, ready to print"""
+    lines = [f"🗺️  {case.name}: {len(case.scenes)} scenes, {len(case.endings)} endings"]
+    best, path = extreme(case, max)
+    worst, _ = extreme(case, min)
+    lines.append(f"  best score:  {describe(best)}" + (f" (answers {','.join(map(str, path))})" if path else ""))
+    lines.append(f"  worst score: {describe(worst)}" +
+                 (" (wrong answers can go on forever)" if worst == -UNBOUNDED else ""))
+    if path:
+        times = reading_time(case, path)
+        longest = max(times, key=times.get)
+        lines.append(f"  forced reading on the best path: {ddxcrook.duration(sum(times.values()))} "
+                     f"(longest: {longest}, {ddxcrook.duration(times[longest])})")
+
+    states, finished = explore(case, turns)
+    if finished:
+        low = min(worst for worst, _, _ in finished.values())
+        high = max(best for _, best, _ in finished.values())
+        lines.append(f"  within {turns} turns: {states:,} states, scores {low} .. {high}")
+    else:
+        lines.append(f"  within {turns} turns: {states:,} states, no ending reached yet")
+
+    first = len(case.scenes)
+    for number, ending in enumerate(case.endings):
+        node = first + number
+        best, _ = extreme(case, max, [node])
+        worst, _ = extreme(case, min, [node])
+        if best is None:
+            lines.append(f"  ending {ending.name!r}: nobody can get this ending")
+            continue
+        line = f"  ending {ending.name!r}: best {describe(best)}, worst {describe(worst)}"
+        if ending.tiers:
+            tiers = sorted({min(tier, len(ending.tiers) - 1) + 1 for tier in tiers_between(worst, best)})
+            line += f", tiers {tiers} of {len(ending.tiers)}"
+        if node in finished:
+            low, high, games = finished[node]
+            line += f" [{games:,} end states within {turns} turns: {low} .. {high}]"
+        lines.append(line)
+
+    problems = check(case)
+    for problem in problems:
+        lines.append(f"  ⚠️  {problem}")
+    if not problems:
+        lines.append("  ✅ good to go")
+    return "\n".join(lines), problems
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Work out every score a ddxCROOK case can give")
+    parser.add_argument("cases", nargs="*", help="cases to check (default: all of them)")
+    parser.add_argument("--turns", type=int, default=20, help="prompt limit for the bounded search (default: 20)")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.cases or ddxcrook.list_cases():
+        try:
+            case = ddxcrook.load_case(name)
+        except ddxcrook.CaseError as e:
+            print(f"❌ {e}")
+            failed = True
+            continue
+        text, problems = report(case, args.turns)
+        print(text + "\n")
+        failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,152 @@
+"""ddxCROOK save files: Ctrl-C on rounds without losing the whole morning 💾
+
+    python ddxcrook.py --save bob.sav      # checkpoints after every answer
+    python ddxcrook.py --resume bob.sav    # right back where you left off
+
+A save file is a tiny header and then a journal of frames:
+
+    length  crc32  JSON
+      I       I    ...
+
+The first frame is a full snapshot (case, scene, stats, findings, hints);
+every checkpoint after that only appends what changed since the last one
+(lists in the chart only ever grow, so a list in a frame means "add these").
+Every so often the journal is squashed back into one snapshot, written to a
+temp file and swapped in with os.replace(), so a save is never half-written.
+A frame cut short by a crash fails its CRC and the previous checkpoint wins.
+"""
+import os
+import json
+import zlib
+import struct
+
+import ddxcrook
+
+MAGIC = b"DDXSAVE"
+SAVE_FORMAT = 2
+HEADER = struct.Struct("<7sB")  # magic, format
+FRAME = struct.Struct("<II")    # length, crc32 of the JSON that follows
+COMPACT_EVERY = 8               # Frames before the journal gets squashed into one snapshot
+
+class SaveError(Exception):
+    """A save file we can't resume from"""
+
+def snapshot(game):
+    """Everything needed to pick the game back up at the current scene"""
+    state = {"case": game.case.name, "hash": game.case.hash,
+             "node": game.node, "charted": game.charted, "hints_used": game.hints_used}
+    for key, value in game.player.items():
+        if isinstance(value, list):
+            # Findings and clues are saved as [tag, text] (anything with a tag and
+            # text counts, whichever copy of ddxcrook made it)
+            value = [[item.tag, item.text] if hasattr(item, "tag") and hasattr(item, "text") else item
+                     for item in value]
+        state[key] = value
+    return state
+
+def changes(old, new):
+    """Just the parts of `new` that differ from `old` (new list items only)"""
+    delta = {}
+    for key, value in new.items():
+        if isinstance(value, list):
+            if value[len(old.get(key, [])):]:
+                delta[key] = value[len(old.get(key, [])):]
+        elif old.get(key) != value:
+            delta[key] = value
+    return delta
+
+def apply(state, delta):
+    for key, value in delta.items():
+        state[key] = state.get(key, []) + value if isinstance(value, list) else value
+    return state
+
+def _frame(data):
+    body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return FRAME.pack(len(body), zlib.crc32(body)) + body
+
+def read_save(path):
+    """Replays the journal; returns (state, number of good frames, where they end)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:HEADER.size] != HEADER.pack(MAGIC, SAVE_FORMAT):
+        raise SaveError(f"{path} isn't a version {SAVE_FORMAT} ddxCROOK save")
+    state, frames, offset = {}, 0, HEADER.size
+    while offset + FRAME.size <= len(data):
+        length, crc = FRAME.unpack_from(data, offset)
+        body = data[offset + FRAME.size:offset + FRAME.size + length]
+        if len(body) < length or zlib.crc32(body) != crc:
+            break  # Torn write at the very end: stop at the last good checkpoint
+        apply(state, json.loads(body.decode("utf-8")))
+        frames += 1
+        offset += FRAME.size + length
+    if not frames:
+        raise SaveError(f"{path} has no checkpoints in it")
+    return state, frames, offset
+
+class SaveFile:
+    """Checkpoints one game into one save file"""
+
+    def __init__(self, path, saved=None, frames=0):
+        self.path = path
+        self.saved = saved    # The state as of the last checkpoint
+        self.frames = frames  # Frames in the journal right now
+
+    def checkpoint(self, game):
+        """Saves the game as it stands (as each scene starts, after every answer and hint)"""
+        state = snapshot(game)
+        if self.saved is None or self.frames >= COMPACT_EVERY:
+            self._rewrite(state)
+        else:
+            delta = changes(self.saved, state)
+            if delta:
+                with open(self.path, "ab") as f:
+                    f.write(_frame(delta))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.frames += 1
+        self.saved = state
+
+    def _rewrite(self, state):
+        """One full snapshot, swapped in all at once"""
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        temp = self.path + f".{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, SAVE_FORMAT) + _frame(state))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, self.path)
+        self.frames = 1
+
+    def finish(self):
+        """The case is over, so there's nothing left to resume"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+def resume(path, **game_args):
+    """A GameState picked up from a save file, ready for play() (which skips the intro)"""
+    try:
+        state, frames, good = read_save(path)
+    except FileNotFoundError:
+        raise SaveError(f"No save file at {path}") from None
+    if os.path.getsize(path) > good:
+        os.truncate(path, good)  # Drop a torn frame so new ones don't land behind it
+    case = ddxcrook.load_case(state["case"])
+    if case.hash != state["hash"]:
+        raise SaveError(f"cases/{case.name}.json has changed since {path} was saved")
+
+    game = ddxcrook.GameState(case, **game_args)
+    for key in game.player:
+        if key in state:
+            game.player[key] = state[key]
+    game.player["diagnosis_hints"] = [ddxcrook.Hint(*clue) for clue in state["diagnosis_hints"]]
+    game.player["findings"] = []
+    ddxcrook.add_findings(game, [ddxcrook.Finding(*finding) for finding in state["findings"]])
+    game.hints_used = state["hints_used"]
+    game.node = state["node"]
+    game.charted = state.get("charted")  # Older saves were always made before the scene's findings
+    game.save = SaveFile(path, state, frames)
+    return game
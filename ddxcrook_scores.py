@@ -0,0 +1,126 @@
+"""Cohort leaderboard: re-score thousands of students in one go 🏆
+
+Give it a CSV of end-of-game stats (one student per row):
+
+    name,correct_choices,reputation,anxiety,hints_used
+    Bob,5,95,10,1
+    ...
+
+and it works out every score, tier and percentile rank with NumPy, without a
+Python loop over the students:
+
+    python ddxcrook_scores.py cohort.csv                 # top 10 + tier breakdown
+    python ddxcrook_scores.py cohort.csv --out ranked.csv
+
+Scores come from ddxcrook.final_score() and tiers from ddxcrook.SCORE_TIERS,
+so when the grading in end_game changes, just run this again.
+"""
+import sys
+import csv
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # Importing this module still works; scoring anything says what's missing
+
+import ddxcrook
+
+COLUMNS = ("name",) + ddxcrook.STATS + ("hints_used",)
+NEEDS_NUMPY = "The leaderboard needs NumPy: pip install numpy"
+
+def _require_numpy():
+    if np is None:
+        raise ImportError(NEEDS_NUMPY)
+
+def load_records(path):
+    """Reads the cohort CSV into a NumPy structured array (one row per student)
+
+    The file goes through the csv module, so quoted names ("Smith, Bob") are fine.
+    """
+    _require_numpy()
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        missing = [column for column in COLUMNS if column not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+        rows = [(row["name"].strip(), *(int((row[column] or "").strip()) for column in COLUMNS[1:]))
+                for row in reader]
+    longest = max((len(row[0]) for row in rows), default=1)
+    return np.array(rows, dtype=[("name", f"U{max(longest, 1)}")] + [(column, np.int64) for column in COLUMNS[1:]])
+
+def score_tiers(scores):
+    """score_tier() for a whole array: 0 for the top tier, 1 for the next one..."""
+    # SCORE_TIERS goes from highest to lowest, so the tier is just how many
+    # thresholds the score didn't beat
+    thresholds = np.asarray(ddxcrook.SCORE_TIERS)
+    return (scores[:, None] <= thresholds).sum(axis=1)
+
+def score_cohort(records):
+    """Scores, tiers, ranks and percentiles for everyone, as arrays in input order"""
+    _require_numpy()
+    stats = {stat: records[stat].astype(np.int64) for stat in ddxcrook.STATS}
+    scores = ddxcrook.final_score(stats)  # The same formula, just on whole columns
+
+    # One sort gives both: how many students you beat or tied, and your place
+    ordered = np.sort(scores)
+    at_or_below = np.searchsorted(ordered, scores, side="right")
+    return {
+        "score": scores,
+        "tier": score_tiers(scores),
+        "rank": len(scores) - at_or_below + 1,  # Ties share a place (1, 2, 2, 4...)
+        "percentile": 100.0 * at_or_below / len(scores),
+    }
+
+def leaderboard(results):
+    """Row order for the leaderboard: best score first, ties in input order"""
+    return np.argsort(-results["score"], kind="stable")
+
+def write_csv(records, results, out):
+    """The whole cohort, best first, with the new columns added (names quoted where they need it)"""
+    writer = csv.writer(out, lineterminator="\n")
+    writer.writerow(["rank", "name", "score", "tier", "percentile", *ddxcrook.STATS, "hints_used"])
+    for row in leaderboard(results):
+        writer.writerow([
+            results["rank"][row], records["name"][row], results["score"][row],
+            results["tier"][row] + 1, f"{results['percentile'][row]:.1f}",
+            *(records[stat][row] for stat in ddxcrook.STATS),
+            records["hints_used"][row],
+        ])
+
+def summary(records, results, top=10):
+    """Top of the leaderboard plus how the cohort spread over the tiers"""
+    count = len(results["score"])
+    lines = [f"🏆 {count:,} students", ""]
+    for row in leaderboard(results)[:top]:
+        lines.append(f"  {results['rank'][row]:>5}. {records['name'][row]:<24} "
+                     f"{results['score'][row]:>5}  ({results['percentile'][row]:.1f} percentile)")
+    lines.append("")
+    tiers = np.bincount(results["tier"], minlength=len(ddxcrook.SCORE_TIERS) + 1)
+    for tier, students in enumerate(tiers):
+        label = f"> {ddxcrook.SCORE_TIERS[tier]}" if tier < len(ddxcrook.SCORE_TIERS) else "the rest"
+        lines.append(f"  tier {tier + 1} ({label}): {students:,} students ({100 * students / count:.1f}%)")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score and rank a whole cohort of ddxCROOK players")
+    parser.add_argument("records", help="CSV with " + ", ".join(COLUMNS) + " columns")
+    parser.add_argument("--out", help="write the full ranked cohort to this CSV")
+    parser.add_argument("--top", type=int, default=10, help="how many students to show (default: 10)")
+    args = parser.parse_args()
+    if np is None:
+        sys.exit(NEEDS_NUMPY)
+
+    try:
+        records = load_records(args.records)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Couldn't read the cohort: {e}")
+    if not len(records):
+        sys.exit("No students in that file!")
+
+    results = score_cohort(records)
+    print(summary(records, results, args.top))
+    if args.out:
+        with open(args.out, "w", newline="", encoding="utf-8") as f:
+            write_csv(records, results, f)
+        print(f"\n📄 Full leaderboard saved to {args.out}")
@@ -0,0 +1,136 @@
+"""ddxCROOK ward server: lots of students, one Python process 🏥
+
+Instead of starting a whole interpreter for every SSH login, run this once and
+have everyone connect over telnet (or nc):
+
+    python ddxcrook_server.py --port 2323
+    telnet localhost 2323
+
+Every connection gets its own GameState, so nobody's anxiety leaks into anyone
+else's chart. The whole game is made of coroutines, so one asyncio event loop
+interleaves every student: while one is reading, the others keep playing.
+"""
+import asyncio
+import argparse
+
+import ddxcrook
+from ddxcrook_log import EventLog
+
+# Telnet control bytes we have to skip over when reading input
+IAC = 255   # "Interpret As Command"
+SB = 250    # Subnegotiation begin...
+SE = 240    # ...and end
+WILL, WONT, DO, DONT = 251, 252, 253, 254
+
+def strip_telnet(data):
+    """Removes telnet negotiation commands, leaving just what the student typed"""
+    out = bytearray()
+    i = 0
+    while i < len(data):
+        byte = data[i]
+        if byte != IAC:
+            out.append(byte)
+            i += 1
+            continue
+        command = data[i + 1] if i + 1 < len(data) else None
+        if command == IAC:
+            out.append(IAC)  # Escaped 255
+            i += 2
+        elif command in (WILL, WONT, DO, DONT):
+            i += 3
+        elif command == SB:
+            end = data.find(bytes([IAC, SE]), i)
+            i = len(data) if end < 0 else end + 2
+        else:
+            i += 2
+    return bytes(out)
+
+class Client:
+    """One student's connection: the game writes to it, sleeps on it and reads from it"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def write(self, text):
+        # Telnet wants \r\n line endings. This just queues bytes on the socket;
+        # sleep() and readline() wait for slow connections to catch up.
+        self.writer.write(text.replace("\n", "\r\n").encode("utf-8"))
+
+    def flush(self):
+        pass
+
+    async def sleep(self, seconds):
+        await self.writer.drain()  # Slow connection? Then this student waits, not everyone.
+        await asyncio.sleep(seconds)
+
+    async def readline(self):
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise EOFError  # Student closed the window
+        return strip_telnet(line).decode("utf-8", errors="ignore").rstrip("\r\n")
+
+async def run_session(game):
+    """One student's whole playthrough"""
+    try:
+        await ddxcrook.play(game)
+        game.screen.flush()
+    except (EOFError, ConnectionError):
+        pass  # They left mid-rotation. Happens to the best of us.
+
+class WardServer:
+    """Accepts students and gives each of them their own game"""
+
+    def __init__(self, case_name="kawasaki", max_sessions=500, log_dir=None, profile="full"):
+        self.case = ddxcrook.load_case(case_name)  # Loaded once, shared by everyone (it's read-only)
+        self.max_sessions = max_sessions
+        self.log_dir = log_dir
+        # Telnet doesn't tell us what the student's terminal can do, so the ward picks
+        self.profile = ddxcrook.PROFILES[profile]
+        self.active = 0
+
+    async def handle(self, reader, writer):
+        """Runs one connection from hello to goodbye"""
+        if self.active >= self.max_sessions:
+            writer.write(b"The ward is full right now. Please try again in a few minutes!\r\n")
+            await writer.drain()
+            writer.close()
+            return
+
+        self.active += 1
+        client = Client(reader, writer)
+        game = ddxcrook.GameState(self.case, stream=client, readline=client.readline, sleep=client.sleep,
+                                  profile=self.profile)
+        if self.log_dir:
+            game.log = EventLog.create(self.log_dir, game)
+        try:
+            await run_session(game)
+        finally:
+            self.active -= 1
+            if game.log:
+                game.log.close()
+            writer.close()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"🏥 ddxCROOK ward open on {host}:{port} (up to {self.max_sessions} students)")
+        async with server:
+            await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many ddxCROOK sessions from one process")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=2323, help="port to listen on (default: 2323)")
+    parser.add_argument("--case", default="kawasaki", help="case every student plays (default: kawasaki)")
+    parser.add_argument("--max-sessions", type=int, default=500, help="how many students at once")
+    parser.add_argument("--log-dir", help="record every session's decisions here (see ddxcrook_log.py)")
+    parser.add_argument("--profile", default="full", choices=tuple(ddxcrook.PROFILES),
+                        help="what to send: colors and emoji (full), no colors (mono) or plain ASCII "
+                             "for slow links (plain)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(WardServer(args.case, args.max_sessions, args.log_dir, args.profile).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nWard closed. Go home and sleep!")
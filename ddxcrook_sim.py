@@ -0,0 +1,199 @@
+"""Monte Carlo ddxCROOK: play the case a million times without a single student 🎲
+
+Plays the real scene engine (the same play() the terminal game runs) in
+instant mode with the screen muted, with a choice policy standing in for the
+student, and reports how score, anxiety, reputation and hints used are
+distributed:
+
+    python ddxcrook_sim.py --policy random --runs 1000000
+    python ddxcrook_sim.py --policy scripted --answers 2,1,1,1,4,1,1,1
+    python ddxcrook_sim.py --policy random --hint-rate 0.2 --workers 8
+
+Games are split into chunks and farmed out to a process pool; each worker
+sends back counters instead of one record per game, so memory stays flat no
+matter how many games we play.
+"""
+import os
+import sys
+import random
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import ddxcrook
+
+METRICS = ("score", "anxiety", "reputation", "correct_choices", "hints_used")
+CHUNK = 5000      # Games per task sent to a worker
+MAX_TURNS = 500   # Answers one game can take before we call it stuck
+
+class SimulationError(Exception):
+    """A simulated game that can't finish (a script that runs out, a policy stuck in a loop)"""
+
+class RandomPolicy:
+    """Picks any option at random, and sometimes asks for a hint first"""
+
+    def __init__(self, rng, hint_rate=0.0):
+        self.rng = rng
+        self.hint_rate = hint_rate
+
+    def __call__(self, game):
+        if game.node is None:
+            return "Dr. Monte Carlo"  # Name prompt
+        if game.hints_used < ddxcrook.max_hints and self.rng.random() < self.hint_rate:
+            return "hint"
+        options = game.case.scenes[game.node].options
+        return str(self.rng.randint(1, len(options)))
+
+class ScriptedPolicy:
+    """Types the same answers every game (and complains if the game wants more)"""
+
+    def __init__(self, rng, answers=()):
+        self.answers = list(answers)
+        self.position = 0
+
+    def __call__(self, game):
+        if game.node is None:
+            self.position = 0
+            return "Dr. Script"
+        if self.position < len(self.answers):
+            self.position += 1
+            return self.answers[self.position - 1]
+        raise SimulationError(f"the script ran out of answers at {game.case.nodes[game.node]!r} "
+                              f"after {len(self.answers)} of them, before the game ended")
+
+POLICIES = {
+    "random": RandomPolicy,
+    "scripted": ScriptedPolicy,
+}
+
+def play_once(case, policy, seed=None):
+    """Plays one full game with the policy answering every prompt"""
+    turns = 0
+
+    async def readline():
+        nonlocal turns
+        turns += 1
+        if turns > MAX_TURNS:
+            raise SimulationError(f"no ending after {MAX_TURNS} answers (stuck at {game.case.nodes[game.node]!r})")
+        return policy(game)
+
+    game = ddxcrook.GameState(case, readline=readline, muted=True, seed=seed)
+    ddxcrook.run_sync(ddxcrook.play(game))
+    return game
+
+def run_chunk(case_name, policy_name, policy_args, runs, seed):
+    """Plays `runs` games and tallies the results (runs inside a worker process)"""
+    ddxcrook.set_render_mode("instant")
+    case = ddxcrook.load_case(case_name)
+    rng = random.Random(seed)
+    policy = POLICIES[policy_name](rng, **policy_args)
+
+    tallies = {metric: Counter() for metric in METRICS}
+    for _ in range(runs):
+        game = play_once(case, policy, seed=rng.getrandbits(32))
+        stats = game.player
+        tallies["score"][ddxcrook.final_score(stats)] += 1
+        tallies["anxiety"][stats["anxiety"]] += 1
+        tallies["reputation"][stats["reputation"]] += 1
+        tallies["correct_choices"][stats["correct_choices"]] += 1
+        tallies["hints_used"][game.hints_used] += 1
+    return tallies
+
+def simulate(case_name="kawasaki", policy_name="random", policy_args=None, runs=100000, workers=None, seed=0):
+    """Plays `runs` games across a process pool and returns one Counter per metric"""
+    policy_args = policy_args or {}
+    chunks = [CHUNK] * (runs // CHUNK)
+    if runs % CHUNK:
+        chunks.append(runs % CHUNK)
+
+    totals = {metric: Counter() for metric in METRICS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        jobs = [pool.submit(run_chunk, case_name, policy_name, policy_args, size, seed + number)
+                for number, size in enumerate(chunks)]
+        for job in jobs:
+            for metric, tally in job.result().items():
+                totals[metric].update(tally)
+    return totals
+
+def percentile(tally, fraction):
+    """The value below which `fraction` of the games fall"""
+    target = fraction * sum(tally.values())
+    seen = 0
+    for value in sorted(tally):
+        seen += tally[value]
+        if seen >= target:
+            return value
+    return None
+
+def describe(tally):
+    """Mean, spread and a few percentiles for one metric"""
+    count = sum(tally.values())
+    mean = sum(value * times for value, times in tally.items()) / count
+    variance = sum((value - mean) ** 2 * times for value, times in tally.items()) / count
+    return {
+        "mean": mean,
+        "stdev": variance ** 0.5,
+        "min": min(tally),
+        "p5": percentile(tally, 0.05),
+        "p50": percentile(tally, 0.50),
+        "p95": percentile(tally, 0.95),
+        "max": max(tally),
+    }
+
+def histogram(tally, buckets=12, width=40):
+    """A little sideways bar chart"""
+    low, high = min(tally), max(tally)
+    size = max(1, -(-(high - low + 1) // buckets))  # Round up
+    counts = Counter()
+    for value, times in tally.items():
+        counts[(value - low) // size] += times
+    biggest = max(counts.values())
+    lines = []
+    for bucket in range(max(counts) + 1):
+        start = low + bucket * size
+        bar = "█" * round(width * counts[bucket] / biggest)
+        lines.append(f"  {start:>6} .. {start + size - 1:<6} {bar} {counts[bucket]}")
+    return "\n".join(lines)
+
+def report(totals):
+    """Turns the tallies into something you can paste in a group chat"""
+    games = sum(totals["score"].values())
+    lines = [f"🎲 {games:,} simulated playthroughs", ""]
+    for metric in METRICS:
+        stats = describe(totals[metric])
+        lines.append(f"{metric}: " + "  ".join(
+            f"{name}={value:.1f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in stats.items()))
+        if metric == "score":
+            lines.append(histogram(totals[metric]))
+            tiers = Counter()
+            for score, times in totals[metric].items():
+                tiers[ddxcrook.score_tier(score)] += times
+            lines.append("  tiers: " + ", ".join(
+                f"{'>' + str(ddxcrook.SCORE_TIERS[tier]) if tier < len(ddxcrook.SCORE_TIERS) else 'rest'}: "
+                f"{100 * tiers[tier] / games:.1f}%"
+                for tier in range(len(ddxcrook.SCORE_TIERS) + 1)))
+        lines.append("")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate lots of ddxCROOK playthroughs")
+    parser.add_argument("--case", default="kawasaki", help="case to simulate (default: kawasaki)")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random", help="how the fake student answers")
+    parser.add_argument("--runs", type=int, default=100000, help="how many games to play")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (same seed, same results)")
+    parser.add_argument("--hint-rate", type=float, default=0.0, help="random policy: chance of asking for a hint")
+    parser.add_argument("--answers", default="1,1,1,1,1", help="scripted policy: comma-separated answers")
+    args = parser.parse_args()
+
+    if args.policy == "random":
+        policy_args = {"hint_rate": args.hint_rate}
+    else:
+        policy_args = {"answers": [answer.strip() for answer in args.answers.split(",")]}
+
+    try:
+        totals = simulate(args.case, args.policy, policy_args, args.runs, args.workers, args.seed)
+    except SimulationError as e:
+        sys.exit(f"Simulation stopped: {e}")
+    print(report(totals))
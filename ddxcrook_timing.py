@@ -0,0 +1,132 @@
+"""ddxCROOK timings: where does a session's time actually go? ⏱️
+
+    python ddxcrook.py --timings          # the breakdown shows up on stderr at the end
+
+Attach a SceneTimer to a game and the hooks in ddxcrook.py (see
+INSTRUMENTATION there) report every decision function, render call, pause and
+input prompt to it. For each scene it adds up:
+
+- wall: everything, start to finish
+- cpu: time the process spent actually computing
+- input: waiting for the student to type something
+- sleep: typewriter and dramatic pauses
+- other: wall minus input and sleep (game logic, rendering, the terminal)
+
+and for every hooked function it keeps a histogram of how long its calls take.
+summary() can be called any time, not just at the end.
+
+CPU time is for the whole process, so on the ward server (many students in
+one process) it includes the other students too.
+"""
+import time
+
+# Upper edges of the histogram buckets, in seconds (the last bucket is "more than that")
+BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+BUCKET_LABELS = ("<10µs", "<100µs", "<1ms", "<10ms", "<100ms", "<1s", "<10s", "10s+")
+BLOCKED = ("input", "sleep")  # Hook kinds that count as waiting, not working
+
+def short_duration(seconds):
+    """1.5µs, 12.3ms, 4.0s, 2m05s..."""
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s"
+
+class Histogram:
+    """How long one function's calls took, bucketed by order of magnitude"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.longest = 0.0
+
+    def add(self, seconds):
+        bucket = 0
+        while bucket < len(BUCKETS) and seconds >= BUCKETS[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.total += seconds
+        self.longest = max(self.longest, seconds)
+
+    @property
+    def calls(self):
+        return sum(self.counts)
+
+class SceneTimer:
+    """A probe for GameState.probe: times every hooked call, scene by scene"""
+
+    def __init__(self, clock=time.perf_counter, cpu_clock=time.process_time):
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.scenes = {}     # scene -> {"visits", "wall", "cpu", "input", "sleep"}
+        self.calls = {}      # (kind, name) -> Histogram
+        self.started = []    # Start times of the hooked calls still running
+        self.current = None  # (scene, wall clock, cpu clock) when it started
+
+    # ======= HOOKS =======
+    def scene(self, name):
+        """A new scene starts (and the last one ends)"""
+        self.close()
+        self.current = (name, self.clock(), self.cpu_clock())
+        self._totals(name)["visits"] += 1
+
+    def enter(self, kind, name):
+        self.started.append(self.clock())
+
+    def exit(self, kind, name):
+        elapsed = self.clock() - self.started.pop()
+        self.calls.setdefault((kind, name), Histogram()).add(elapsed)
+        if kind in BLOCKED and self.current:
+            self._totals(self.current[0])[kind] += elapsed
+    # ======= END HOOKS =======
+
+    def _totals(self, scene):
+        return self.scenes.setdefault(scene, {"visits": 0, "wall": 0.0, "cpu": 0.0, "input": 0.0, "sleep": 0.0})
+
+    def close(self):
+        """Books the time of the scene that's running (call it at the end of the game)"""
+        if self.current:
+            name, wall, cpu = self.current
+            totals = self._totals(name)
+            totals["wall"] += self.clock() - wall
+            totals["cpu"] += self.cpu_clock() - cpu
+            self.current = (name, self.clock(), self.cpu_clock())
+
+    def as_dict(self):
+        """Everything we measured, ready for json.dump()"""
+        self.close()
+        return {
+            "scenes": {name: dict(totals, other=totals["wall"] - totals["input"] - totals["sleep"])
+                       for name, totals in self.scenes.items()},
+            "calls": {f"{kind}.{name}": {"calls": histogram.calls, "total": histogram.total,
+                                         "longest": histogram.longest,
+                                         "histogram": dict(zip(BUCKET_LABELS, histogram.counts))}
+                      for (kind, name), histogram in self.calls.items()},
+        }
+
+    def summary(self):
+        """A table per scene and a histogram per hooked function"""
+        self.close()
+        columns = ("wall", "cpu", "input", "sleep", "other")
+        lines = [f"{'scene':<24}" + "".join(f"{column:>10}" for column in columns)]
+        grand = dict.fromkeys(columns, 0.0)
+        for name, totals in self.scenes.items():
+            row = dict(totals, other=totals["wall"] - totals["input"] - totals["sleep"])
+            for column in columns:
+                grand[column] += row[column]
+            label = name if totals["visits"] == 1 else f"{name} (x{totals['visits']})"
+            lines.append(f"{label:<24}" + "".join(f"{short_duration(row[column]):>10}" for column in columns))
+        lines.append(f"{'TOTAL':<24}" + "".join(f"{short_duration(grand[column]):>10}" for column in columns))
+
+        lines.append("")
+        lines.append(f"{'call':<32}{'calls':>7}{'total':>10}{'longest':>10}  " +
+                     " ".join(f"{label:>6}" for label in BUCKET_LABELS))
+        for (kind, name), histogram in sorted(self.calls.items(), key=lambda item: -item[1].total):
+            lines.append(f"{kind + ' ' + name:<32}{histogram.calls:>7}{short_duration(histogram.total):>10}"
+                         f"{short_duration(histogram.longest):>10}  " +
+                         " ".join(f"{count or '.':>6}" for count in histogram.counts))
+        return "\n".join(lines)
@@ -0,0 +1,24 @@
+"""Typed diagnoses: typos, shorthand and synonyms 🩺"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ddxcrook
+
+def test_swapped_letters_are_one_typo():
+    assert ddxcrook.edit_distance("measels", "measles") == 1
+    assert ddxcrook.edit_distance("measles", "measels") == 1
+
+def test_limit_gives_up_at_limit_plus_one():
+    """Anything further away than the limit comes back as exactly limit + 1"""
+    assert ddxcrook.edit_distance("kawasaki", "scarlatina", limit=2) == 3
+    assert ddxcrook.edit_distance("abc", "xyz", limit=1) == 2
+    assert ddxcrook.edit_distance("abc", "xyz") == 3
+
+def test_lookup():
+    index = ddxcrook.diagnosis_index()
+    assert index.lookup("kawasaky dz") == "Kawasaki disease"  # typo + shorthand
+    assert index.lookup("scarlatina") == "Scarlet fever"      # synonym
+    assert index.lookup("flibbertigibbet") is None
@@ -0,0 +1,23 @@
+"""The case checker's "how long is this case?" numbers 🗺️"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ddxcrook
+import ddxcrook_paths
+
+def test_reading_time_is_what_the_clock_waited():
+    """Every pause on the best path really goes through the VirtualClock,
+    and the per-scene totals add up to exactly what it waited"""
+    case = ddxcrook.load_case("kawasaki")
+    _, path = ddxcrook_paths.extreme(case, max)
+    clock = ddxcrook.VirtualClock()
+    mode = ddxcrook.render_mode
+    times = ddxcrook_paths.reading_time(case, path, clock)
+    assert clock.now > 0
+    assert clock.now == pytest.approx(sum(times.values()))
+    assert ddxcrook.render_mode == mode  # Put back the way we found it
@@ -0,0 +1,42 @@
+"""Save files from the real command line game 💾"""
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ddxcrook_save
+
+def play(args, answers):
+    """Runs `python ddxcrook.py --instant ...`, typing `answers` and then hanging up"""
+    return subprocess.run([sys.executable, os.path.join(ROOT, "ddxcrook.py"), "--instant", *args],
+                          input="".join(answer + "\n" for answer in answers),
+                          capture_output=True, text=True, timeout=60, cwd=ROOT)
+
+def test_save_after_a_clue(tmp_path):
+    """Answer 1 in the first Kawasaki scene hands out a Diagnosis Clue, and the
+    next checkpoint still has to save (the game runs as __main__, not ddxcrook)"""
+    path = str(tmp_path / "bob.sav")
+    result = play(["--save", path], ["Bob", "", "1"])
+    assert "not JSON serializable" not in result.stdout
+
+    state, frames, _ = ddxcrook_save.read_save(path)
+    assert state["node"] == 1  # second_decision
+    assert state["diagnosis_hints"]
+    assert all(len(clue) == 2 for clue in state["diagnosis_hints"])
+
+def test_quitting_keeps_penalties_and_hints(tmp_path):
+    """Two wrong answers and a hint in the first scene, then hang up: the
+    save has to remember all three, not just how the scene started"""
+    path = str(tmp_path / "bob.sav")
+    play(["--save", path], ["Bob", "", "4", "4", "hint"])
+
+    state, frames, _ = ddxcrook_save.read_save(path)
+    assert state["node"] == 0  # still first_decision
+    assert state["anxiety"] == 40
+    assert state["reputation"] == 30
+    assert state["hints_used"] == 1
+
+    resumed = play(["--resume", path], ["1"] * 8)
+    assert "Clinical Pearls Used: 1/3" in resumed.stdout